@@ -0,0 +1,70 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from array import array
+from struct import Struct
+import sys
+
+from lib.nbt import NBTException
+
+
+BYTE = Struct('>b')
+UBYTE = Struct('>B')
+SHORT = Struct('>h')
+USHORT = Struct('>H')
+INT = Struct('>l')
+LONG = Struct('>q')
+FLOAT = Struct('>f')
+DOUBLE = Struct('>d')
+
+HEADER = Struct('>BH')
+
+
+def unpackArray(typecode: str, data: bytes | bytearray | memoryview, offset: int, count: int) -> array:
+    '''
+    Decodes count big endian values of the given array typecode in a single pass.
+    '''
+
+    values = array(typecode)
+    if count < 0:
+        raise NBTException(f"Invalid length: {count}.")
+    elif offset + count * values.itemsize > len(data):
+        raise NBTException("Unexpected end of NBT data.")
+
+    values.frombytes(data[offset:offset + count * values.itemsize])
+    if values.itemsize > 1 and sys.byteorder == 'little':
+        values.byteswap()
+
+    return values
+
+
+def packArrayInto(values: array, buffer: memoryview, offset: int) -> int:
+    '''
+    Writes the values as big endian in a single copy.
+
+    @return int The offset right after the values
+    '''
+
+    if values.itemsize > 1 and sys.byteorder == 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    size = len(values) * values.itemsize
+    with memoryview(values) as view, view.cast('B') as data:
+        buffer[offset:offset + size] = data
+
+    return offset + size
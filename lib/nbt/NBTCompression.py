@@ -0,0 +1,196 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import io
+import os
+from struct import pack
+import time
+import zlib
+from enum import Enum
+from typing import BinaryIO
+
+
+class NBTCompression(Enum):
+    '''
+    Compression applied to NBT data, numbered like the compression types of region file chunks.
+    '''
+
+    GZIP = 1
+    ZLIB = 2
+    NONE = 3
+
+    @staticmethod
+    def detect(head: bytes | bytearray | memoryview) -> 'NBTCompression':
+        '''
+        Sniffs the compression from the first two bytes of the data.
+
+        @param bytes head
+
+        @return NBTCompression
+        '''
+
+        if len(head) < 2:
+            return NBTCompression.NONE
+        elif head[0] == 0x1f and head[1] == 0x8b:
+            return NBTCompression.GZIP
+        # CM = 8 (deflate) and the FCHECK bits make the header a multiple of 31
+        elif head[0] & 0x0f == 8 and ((head[0] << 8) | head[1]) % 31 == 0:
+            return NBTCompression.ZLIB
+
+        return NBTCompression.NONE
+
+    @staticmethod
+    def peek(stream: BinaryIO) -> 'NBTCompression':
+        '''
+        Detects the compression of a stream without consuming it.
+        The stream must either support peek() (like files opened in binary mode) or be seekable.
+
+        @param BinaryIO stream
+
+        @return NBTCompression
+        '''
+
+        if hasattr(stream, 'peek'):
+            return NBTCompression.detect(stream.peek(2)[:2])
+
+        position = stream.tell()
+        head = stream.read(2)
+        stream.seek(position)
+
+        return NBTCompression.detect(head)
+
+    def open(self, stream: BinaryIO, bufferSize: int = 65536) -> BinaryIO:
+        '''
+        Wraps a stream so that reading from it returns the decompressed data, a block at a time.
+
+        @param BinaryIO stream
+        @param int bufferSize
+
+        @return BinaryIO
+        '''
+
+        match self:
+            case NBTCompression.GZIP:
+                return gzip.GzipFile(fileobj=stream, mode='rb')
+
+            case NBTCompression.ZLIB:
+                return io.BufferedReader(_ZlibStream(stream, bufferSize), bufferSize)
+
+        return stream
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes | bytearray | memoryview:
+        '''
+        Decompresses a whole buffer at once.
+
+        @param bytes data
+
+        @return bytes
+        '''
+
+        match self:
+            case NBTCompression.GZIP:
+                return gzip.decompress(data)
+
+            case NBTCompression.ZLIB:
+                return zlib.decompress(data)
+
+        return data
+
+    def compress(self, data: bytes | bytearray | memoryview, level: int = 7, blockSize: int = 131072, threads: int = 1) -> bytes:
+        '''
+        Compresses a whole buffer at once.
+
+        With more than one thread, gzip data is split in blocks of blockSize bytes that are deflated in parallel (zlib
+        releases the GIL), each one primed with the last 32 KiB of the previous block like pigz does. The result is a
+        single regular gzip member.
+
+        @param bytes data
+        @param int level
+        @param int blockSize
+        @param int threads Number of threads, 0 for one per CPU
+
+        @return bytes
+        '''
+
+        match self:
+            case NBTCompression.GZIP:
+                if threads == 0:
+                    threads = os.cpu_count() or 1
+
+                if threads == 1 or len(data) <= blockSize:
+                    return gzip.compress(data, level)
+
+                return _compressGzipBlocks(data, level, blockSize, threads)
+
+            case NBTCompression.ZLIB:
+                return zlib.compress(data, level)
+
+        return bytes(data)
+
+
+_WINDOW_SIZE = 32768
+
+
+def _compressGzipBlocks(data: bytes | bytearray | memoryview, level: int, blockSize: int, threads: int) -> bytes:
+    with memoryview(data) as view, view.cast('B') as buffer:
+        def deflate(start: int) -> bytes:
+            end = min(start + blockSize, len(buffer))
+            if start == 0:
+                compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            else:
+                compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=buffer[max(0, start - _WINDOW_SIZE):start])
+
+            # Every block but the last ends byte-aligned without the final bit, so that the blocks can be concatenated
+            return compressor.compress(buffer[start:end]) + compressor.flush(zlib.Z_FINISH if end == len(buffer) else zlib.Z_SYNC_FLUSH)
+
+        with ThreadPoolExecutor(threads) as executor:
+            blocks = list(executor.map(deflate, range(0, len(buffer), blockSize)))
+
+        header = b'\x1f\x8b\x08\x00' + pack('<L', int(time.time())) + b'\x00\xff'
+        trailer = pack('<LL', zlib.crc32(buffer), len(buffer) & 0xffffffff)
+
+    return header + b''.join(blocks) + trailer
+
+
+class _ZlibStream(io.RawIOBase):
+    '''
+    Raw stream that inflates a zlib stream as it is read.
+    Anything after the end of the zlib stream (like the padding of region file sectors) is ignored.
+    '''
+
+    def __init__(self, stream: BinaryIO, bufferSize: int = 65536):
+        self._stream = stream
+        self._bufferSize = bufferSize
+        self._decompressor = zlib.decompressobj()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._decompressor.eof:
+            data = self._decompressor.unconsumed_tail or self._stream.read(self._bufferSize)
+            if not data:
+                raise EOFError("Compressed data ended before the end-of-stream marker was reached")
+
+            chunk = self._decompressor.decompress(data, len(buffer))
+            if chunk:
+                buffer[:len(chunk)] = chunk
+                return len(chunk)
+
+        return 0
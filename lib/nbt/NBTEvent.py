@@ -0,0 +1,36 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Any, NamedTuple
+
+from lib.nbt import NBTTagType, NBTEventType
+
+
+class NBTEvent(NamedTuple):
+    '''
+    A single step of a streamed NBT document.
+
+    START_COMPOUND: tagType is TAG_Compound, payload is None
+    START_LIST: tagType is the type of the list elements, payload is the list length
+    VALUE: tagType is the type of the value, payload is the decoded value (array.array for typed arrays)
+    END: tagType is TAG_Compound or TAG_List, name is the name of the closed tag
+    '''
+
+    event: NBTEventType
+    tagType: NBTTagType
+    name: str
+    payload: Any = None
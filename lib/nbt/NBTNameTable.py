@@ -0,0 +1,101 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+
+class NBTNameTable:
+    '''
+    Decodes tag names through a cache keyed on their UTF-8 bytes, so that a name repeated across tags, and across
+    parsed trees, is decoded once and shared by all of them.
+
+    The cache holds at most maxSize names and is emptied when full, which keeps it bounded without any bookkeeping
+    on hits. NBTParser and NBTReader use the table returned by getDefault unless given another one.
+    '''
+
+    def __init__(self, maxSize: int = 8192):
+        self._maxSize = maxSize
+        self._names: dict[bytes, str] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def getDefault() -> NBTNameTable:
+        return _default
+
+    @staticmethod
+    def setDefault(table: NBTNameTable) -> None:
+        global _default
+        _default = table
+
+    def decode(self, data: bytes | bytearray | memoryview, start: int, end: int) -> str:
+        '''
+        @param bytes|bytearray|memoryview data
+        @param int start
+        @param int end
+
+        @return str The name encoded in data[start:end]
+        '''
+
+        raw = data[start:end]
+        # Read-only memoryviews hash like bytes, writable ones must be copied first
+        if not isinstance(raw, bytes) and not raw.readonly:
+            raw = bytes(raw)
+
+        name = self._names.get(raw)
+        if name is not None:
+            self._hits += 1
+            return name
+
+        self._misses += 1
+        if len(self._names) >= self._maxSize:
+            self._names.clear()
+
+        name = str(raw, 'utf-8')
+        self._names[bytes(raw)] = name
+
+        return name
+
+    def getMaxSize(self) -> int:
+        return self._maxSize
+
+    def getHits(self) -> int:
+        return self._hits
+
+    def getMisses(self) -> int:
+        return self._misses
+
+    def getHitRate(self) -> float:
+        '''
+        @return float The share of names found in the table since it was created or its statistics were reset
+        '''
+
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def resetStatistics(self) -> None:
+        self._hits = 0
+        self._misses = 0
+
+    def clear(self) -> None:
+        self._names.clear()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+_default = NBTNameTable()
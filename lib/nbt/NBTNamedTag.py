@@ -15,47 +15,399 @@
 # limitations under the License.
 
 
+from __future__ import annotations
+
 from abc import abstractmethod
-from struct import pack
-from typing import TypeVar, Generic
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+import re
+from struct import Struct
+from typing import TextIO, TypeVar, Generic
 
-from lib.nbt import NBTTag
+from lib.nbt import NBTTag, NBTException
+from lib.nbt.NBTBinary import HEADER
 
 
 T = TypeVar('T')
 
 
 class NBTNamedTag(NBTTag, Generic[T]):
+    '''
+    Tags have no __dict__, and no metadata dict unless one is asked for, so a value tag takes 72 bytes
+    on 64-bit CPython (as measured by sys.getsizeof) besides its name and payload.
+    '''
+
+    __slots__ = ('_name', '_payload', '_additionalMetadata', '_parent')
+
+    _snbtBrackets: str | None = None
+    '''
+    Opening and closing brackets of container tags, None for value tags
+    '''
+
+    _namedChildren: bool = False
+    '''
+    If the children of this container are written with their names
+    '''
+
+    _struct: Struct | None = None
+    '''
+    Precompiled struct of the payload of fixed size value tags
+    '''
+
+    _payloadSize: int | None = None
+    '''
+    Cached payload size of container tags, which have a slot for it. Value tags compute their size every time
+    '''
+
+    _raw: memoryview | None = None
+    '''
+    Bytes a container tag was parsed from, see NBTParser.parse keepRaw
+    '''
+
+    _offset: int | None = None
+    '''
+    Offset of the payload of a value tag in the parsed data, which value tags have a slot for (see getOffset)
+    '''
+
     def __init__(self, name: str = '', payload: T = None, additionalMetadata: dict = {}):
         self._name = name
         self._payload = payload
-        self._additionalMetadata = dict(additionalMetadata)
+        # Created on first use, as almost no tag has any
+        self._additionalMetadata: dict | None = dict(additionalMetadata) if additionalMetadata else None
+        self._parent: NBTNamedTag | None = None
+        if self._snbtBrackets is None:
+            self._offset: int | None = None
 
     def getName(self) -> str:
         return self._name
 
     def setName(self, name: str):
+        if self._parent is not None:
+            self._parent._renameChild(self, name)
+
         self._name = name
 
+        if self._parent is not None:
+            self._parent.invalidate()
+
     def getPayload(self) -> T:
         return self._payload
 
     def setPayload(self, payload: T):
         self._payload = payload
+        self.invalidate()
+
+    def getOffset(self) -> int | None:
+        '''
+        @return int|None Where the payload of the tag was in the parsed data, if NBTParser recorded it
+        '''
+
+        return self._offset
+
+    def getParent(self) -> NBTNamedTag | None:
+        return self._parent
+
+    def _adopt(self, tag: NBTNamedTag) -> None:
+        '''
+        Makes this container the parent of tag. A tag is in a single container at a time, so it is first removed from
+        the one it was in, which would otherwise keep a stale cached size and raw bytes.
+        '''
+
+        if tag._parent is not None and tag._parent is not self:
+            tag._parent._removeChild(tag)
+
+        tag._parent = self
+
+    def _removeChild(self, tag: NBTNamedTag) -> None:
+        '''
+        Called when a child of this container is added to another container.
+        '''
+
+        pass
+
+    def _renameChild(self, tag: NBTNamedTag, name: str) -> None:
+        '''
+        Called before a child of this container is renamed, so that containers indexing their children by name can follow.
+        '''
+
+        pass
+
+    def invalidate(self) -> None:
+        '''
+        Marks this tag and every container above it as modified, dropping their cached payload size and the raw bytes
+        they were parsed from (see NBTParser.parse keepRaw).
+        Must be called whenever the payload is changed in place.
+        '''
+
+        tag = self
+        while tag is not None:
+            if tag._snbtBrackets is not None:
+                tag._payloadSize = None
+                tag._raw = None
+
+            tag = tag._parent
+
+    def isModified(self) -> bool:
+        '''
+        @return bool If the tag can't be written by copying the bytes it was parsed from
+        '''
+
+        return self._raw is None
 
     def getAdditionalMetadata(self) -> dict:
+        if self._additionalMetadata is None:
+            self._additionalMetadata = {}
+
         return self._additionalMetadata
 
     def getPayloadSize(self) -> int:
+        if self._snbtBrackets is None:
+            return self._computePayloadSize()
+        elif self._payloadSize is None:
+            # Measure the uncached descendant containers first, deepest last in order, so that no call recurses
+            order = []
+            pending = [self]
+            while pending:
+                tag = pending.pop()
+                order.append(tag)
+
+                parts = tag._binaryParts()
+                if parts is not None:
+                    pending.extend([child for child in parts[1] if isinstance(child, NBTNamedTag) and child._snbtBrackets is not None and child._payloadSize is None])
+
+            for tag in reversed(order):
+                tag._payloadSize = tag._computePayloadSize()
+
+        return self._payloadSize
+
+    def _computePayloadSize(self) -> int:
         return self.getType().size()
 
     def getByteLength(self) -> int:
-        return 1 + 2 + len(self.getName() or "") + self.getPayloadSize()
+        return 1 + 2 + len((self.getName() or "").encode('utf-8')) + self.getPayloadSize()
 
     @abstractmethod
     def payloadAsBinary(self) -> bytes:
         pass
 
+    def headerAsBinary(self) -> bytes:
+        nameEncoded = (self.getName() or '').encode('utf-8')
+        return HEADER.pack(self.getType().value, len(nameEncoded)) + nameEncoded
+
     def toBinary(self) -> bytes:
-        nameEncoded = self.getName().encode('utf-8') or b''
-        return pack('>B', self.getType().value) + pack('>H', len(nameEncoded)) + nameEncoded + self.payloadAsBinary()
+        return self._encodeBinary(True)
+
+    def writeBinary(self, buffer: bytearray | memoryview, offset: int = 0) -> int:
+        '''
+        Serializes the tag straight into a writable buffer, which must have at least getByteLength() bytes after offset.
+
+        @param bytearray|memoryview buffer
+        @param int offset
+
+        @return int The offset right after the tag
+        '''
+
+        view = memoryview(buffer).cast('B')
+        try:
+            if len(view) - offset < self.getByteLength():
+                raise NBTException(f"The buffer is too small: {self.getByteLength()} bytes are needed, but only {len(view) - offset} are available.")
+
+            return self._writeBinary(view, offset, True)
+        finally:
+            view.release()
+
+    def _binaryParts(self) -> tuple[bytes, Iterable[NBTNamedTag | bytes | memoryview], bool, bytes] | None:
+        '''
+        Describes a container for the serializers: the bytes before its children, the children (or raw bytes
+        of already encoded children), whether the children are written with a header and the bytes after them.
+        Value tags return None and are written with _writePayload.
+        '''
+
+        return None
+
+    def _writePayload(self, buffer: memoryview, offset: int) -> int:
+        if self._struct is not None:
+            self._struct.pack_into(buffer, offset, self.getPayload())
+            return offset + self._struct.size
+
+        data = self.payloadAsBinary()
+        buffer[offset:offset + len(data)] = data
+
+        return offset + len(data)
+
+    def _encodeBinary(self, named: bool) -> bytes:
+        buffer = bytearray(self.getByteLength() if named else self.getPayloadSize())
+        with memoryview(buffer) as view:
+            self._writeBinary(view, 0, named)
+
+        return bytes(buffer)
+
+    def _writeBinary(self, buffer: memoryview, offset: int, named: bool) -> int:
+        packHeader = HEADER.pack_into
+        # Tag ids by class, as reading the value of an enum member is comparatively slow
+        typeIds: dict[type, int] = {}
+        # Each entry holds the children left to write in an open container, whether they are named and its closing bytes
+        stack: list[tuple[Iterator, bool, bytes]] = [(iter((self,)), named, b'')]
+        while stack:
+            children, childrenNamed, suffix = stack[-1]
+            for tag in children:
+                if not isinstance(tag, NBTNamedTag):
+                    buffer[offset:offset + len(tag)] = tag
+                    offset += len(tag)
+                    continue
+
+                if childrenNamed:
+                    typeId = typeIds.get(tag.__class__)
+                    if typeId is None:
+                        typeId = typeIds[tag.__class__] = tag._type.value
+
+                    nameEncoded = (tag._name or '').encode('utf-8')
+                    packHeader(buffer, offset, typeId, len(nameEncoded))
+                    offset += 3
+                    buffer[offset:offset + len(nameEncoded)] = nameEncoded
+                    offset += len(nameEncoded)
+
+                if tag._snbtBrackets is None:
+                    if tag._struct is not None:
+                        tag._struct.pack_into(buffer, offset, tag._payload)
+                        offset += tag._struct.size
+                    else:
+                        offset = tag._writePayload(buffer, offset)
+
+                    continue
+
+                # Unmodified containers are copied verbatim from the data they were parsed from
+                if tag._raw is not None:
+                    buffer[offset:offset + len(tag._raw)] = tag._raw
+                    offset += len(tag._raw)
+                    continue
+
+                parts = tag._binaryParts()
+                if parts is None:
+                    offset = tag._writePayload(buffer, offset)
+                    continue
+
+                buffer[offset:offset + len(parts[0])] = parts[0]
+                offset += len(parts[0])
+                stack.append((iter(parts[1]), parts[2], parts[3]))
+                break
+            else:
+                stack.pop()
+                buffer[offset:offset + len(suffix)] = suffix
+                offset += len(suffix)
+
+        return offset
+
+    def writeSNBT(self, stream: TextIO, format: bool = True) -> None:
+        '''
+        Writes the SNBT of the tag straight into a text stream, a block at a time.
+
+        @param TextIO stream
+        @param bool format
+        '''
+
+        if self._snbtBrackets is None:
+            stream.write(self.toSNBT(format))
+        else:
+            self._encodeSNBT(format, 1, stream)
+
+    def _encodeSNBT(self, format: bool = True, iteration: int = 1, stream: TextIO | None = None) -> str:
+        '''
+        Serializes a compound or list to SNBT using an explicit stack instead of recursion.
+        Every piece is appended to a single list, so nested containers are not copied once per level.
+        With a stream, the list is written out whenever it grows past _SNBT_FLUSH_PIECES and an empty string is returned.
+        Containers are recognized by their _snbtBrackets.
+        '''
+
+        content: list[str] = []
+        append = content.append
+        colon = ': ' if format else ':'
+        # Rendered keys of this call, followed by the colon
+        keys: dict[str, str] = {}
+        # Opening and separating whitespace by level, built as levels are reached
+        openings: list[str] = []
+        separators: list[str] = []
+
+        def reach(level: int) -> None:
+            while len(openings) <= level:
+                indent = ''.rjust(len(openings) * 2, ' ')
+                openings.append("\n" + indent if format else '')
+                separators.append(",\n" + indent if format else ',')
+
+        reach(iteration + 1)
+        append(self._snbtBrackets[0])
+        append(openings[iteration])
+
+        # Each entry holds an open container, its children left to write and its iteration
+        stack: list[tuple[NBTNamedTag, Iterator, int]] = [(self, iter(self.getPayload()), iteration)]
+        while stack:
+            tag, children, level = stack[-1]
+            named = tag._namedChildren
+            separator = separators[level]
+
+            for child in children:
+                if named:
+                    key = keys.get(child._name)
+                    if key is None:
+                        key = keys[child._name] = _snbtKey(child._name) + colon
+
+                    append(key)
+
+                if child._snbtBrackets is None:
+                    append(child.toSNBT(format, level + 1))
+                    append(separator)
+
+                    # The last piece is kept, as it may be a separator to drop
+                    if stream is not None and len(content) > _SNBT_FLUSH_PIECES:
+                        stream.write(''.join(content[:-1]))
+                        del content[:-1]
+
+                    continue
+
+                if len(openings) <= level + 2:
+                    reach(level + 2)
+
+                append(child._snbtBrackets[0])
+                append(openings[level + 1])
+                stack.append((child, iter(child.getPayload()), level + 1))
+                break
+            else:
+                stack.pop()
+
+                # Replace the separator after the last child, if any, by the closing whitespace
+                if content[-1] is separator:
+                    content.pop()
+
+                append(openings[level - 1])
+                append(tag._snbtBrackets[1])
+
+                if stack:
+                    append(separators[stack[-1][2]])
+
+                if stream is not None and len(content) > _SNBT_FLUSH_PIECES:
+                    stream.write(''.join(content[:-1]))
+                    del content[:-1]
+
+        if stream is not None:
+            stream.write(''.join(content))
+            return ''
+
+        return ''.join(content)
+
+
+# Number of pieces buffered before writing to a stream
+_SNBT_FLUSH_PIECES = 16384
+
+_SNBT_UNQUOTED_KEY = re.compile(r'[0-9A-Za-z_\-.+]+')
+
+
+@lru_cache(maxsize=65536)
+def _snbtKey(name: str) -> str:
+    '''
+    Renders a compound key, quoting it only if it has characters that aren't allowed in unquoted SNBT strings.
+    '''
+
+    if _SNBT_UNQUOTED_KEY.fullmatch(name):
+        return name
+
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
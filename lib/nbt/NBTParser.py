@@ -15,313 +15,1034 @@
 # limitations under the License.
 
 
+from array import array
 import re
-from struct import unpack
-
-from lib.nbt import NBTNamedTag, NBTTag, NBTTagType, NBTException
-from lib.nbt.tag import NBTTagByte, NBTTagByteArray, NBTTagCompound, NBTTagDouble, NBTTagEnd, NBTTagFloat, NBTTagInt, NBTTagIntArray, NBTTagList, NBTTagLong, NBTTagLongArray, NBTTagShort, NBTTagString
+import struct
+from collections.abc import Callable
+from os import PathLike
+from typing import BinaryIO, TextIO
+
+from lib.nbt import NBTNamedTag, NBTTag, NBTTagType, NBTException, NBTCompression, NBTEventType, NBTNameTable, NBTReader
+from lib.nbt.NBTBinary import BYTE, SHORT, USHORT, INT, LONG, FLOAT, DOUBLE, unpackArray
+from lib.nbt.tag import NBTTagByte, NBTTagByteArray, NBTTagCompound, NBTTagDouble, NBTTagEnd, NBTTagFloat, NBTTagInt, NBTTagIntArray, NBTTagList, NBTTagLong, NBTTagLongArray, NBTTagShort, NBTTagString, NBTLazyTagCompound, NBTLazyTagList, NBTPackedTagList
 from lib.settings import settings
 
 
+# Payload sizes of TAG_End to TAG_Double, and element sizes of the typed arrays, by tag id
+_FIXED_SIZES = (0, 1, 2, 4, 8, 4, 8)
+_ARRAY_SIZES = {7: 1, 11: 4, 12: 8}
+
+_TAG_TYPES = tuple(NBTTagType)
+
+_SNBT_WHITESPACE = re.compile(r'\s*')
+# Characters allowed in unquoted strings, which also cover numbers and booleans
+_SNBT_UNQUOTED = re.compile(r'[0-9A-Za-z_\-.+]+')
+_SNBT_INTEGER = re.compile(r'[-+]?\d+([bBsSlL]?)')
+_SNBT_DECIMAL = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?([fFdD]?)')
+
+# Characters kept ahead of the scanner when parsing a SNBT stream, enough for a string of 65535 escaped characters
+_SNBT_LOOKAHEAD = 262144
+
+# Classes of the tags that NBTReader emits as VALUE events, by tag id
+_VALUE_TAGS = {
+    1: NBTTagByte, 2: NBTTagShort, 3: NBTTagInt, 4: NBTTagLong, 5: NBTTagFloat, 6: NBTTagDouble,
+    7: NBTTagByteArray, 8: NBTTagString, 11: NBTTagIntArray, 12: NBTTagLongArray,
+}
+
+# Binary array typecode of the elements of lists stored as NBTPackedTagList, by tag id
+_PACKED_LISTS = {1: 'b', 2: 'h', 3: 'i', 4: 'q', 5: 'f', 6: 'd'}
+
+# Number tags a SNBT number without suffix can be forced to
+_SNBT_NUMBERS = {
+    NBTTagType.TAG_Byte: NBTTagByte, NBTTagType.TAG_Short: NBTTagShort, NBTTagType.TAG_Int: NBTTagInt,
+    NBTTagType.TAG_Long: NBTTagLong, NBTTagType.TAG_Float: NBTTagFloat, NBTTagType.TAG_Double: NBTTagDouble,
+}
+
+
+def _checkLength(data: memoryview, offset: int, count: int, itemSize: int) -> None:
+    '''
+    Rejects a declared element count that is negative or runs past the end of data, before the cursor moves by it.
+    '''
+
+    if count < 0:
+        raise NBTException(f"Invalid length: {count}.")
+    elif offset + count * itemSize > len(data):
+        raise NBTException("Unexpected end of NBT data.")
+
+
+def _tagType(tagId: int) -> NBTTagType:
+    '''
+    Looks up the type of a tag id read from binary NBT, rejecting unknown ones.
+    '''
+
+    if tagId >= len(_TAG_TYPES):
+        raise NBTException(f"Invalid tag type: {tagId}")
+
+    return _TAG_TYPES[tagId]
+
+
+def _snbtSequence(element: str) -> re.Pattern:
+    '''
+    Matches a whole run of comma separated elements, optionally followed by a trailing comma.
+    '''
+
+    return re.compile(rf'\s*(?:{element}\s*(?:,\s*{element}\s*)*,?\s*)?')
+
+
+_SNBT_INTEGER_ELEMENT = r'[-+]?\d+'
+_SNBT_DECIMAL_ELEMENT = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+_SNBT_NUMBER_START = frozenset('-+.0123456789')
+
+# Deletes the type suffixes from a run of numbers
+_SNBT_SUFFIXES = str.maketrans('', '', 'bBsSlLfFdD')
+
+# Typed array classes by SNBT prefix, with the pattern of a run of their elements
+_SNBT_ARRAYS = {
+    'B': (NBTTagByteArray, _snbtSequence(_SNBT_INTEGER_ELEMENT + '[bB]?')),
+    'I': (NBTTagIntArray, _snbtSequence(_SNBT_INTEGER_ELEMENT)),
+    'L': (NBTTagLongArray, _snbtSequence(_SNBT_INTEGER_ELEMENT + '[lL]?')),
+}
+
+# Pattern of a run of elements of numeric lists by element type, and the function converting them
+_SNBT_NUMBER_LISTS = {
+    NBTTagType.TAG_Byte: (_snbtSequence(_SNBT_INTEGER_ELEMENT + '[bB]'), int),
+    NBTTagType.TAG_Short: (_snbtSequence(_SNBT_INTEGER_ELEMENT + '[sS]'), int),
+    NBTTagType.TAG_Int: (_snbtSequence(_SNBT_INTEGER_ELEMENT), int),
+    NBTTagType.TAG_Long: (_snbtSequence(_SNBT_INTEGER_ELEMENT + '[lL]'), int),
+    NBTTagType.TAG_Float: (_snbtSequence(_SNBT_DECIMAL_ELEMENT + '[fF]'), float),
+    NBTTagType.TAG_Double: (_snbtSequence(rf'(?:{_SNBT_DECIMAL_ELEMENT}[dD]|[-+]?(?:\d+\.\d*|\.\d+|\d+(?=[eE]))(?:[eE][-+]?\d+)?)'), float),
+}
+
+
 class NBTParser:
     @staticmethod
-    def parse(nbtData: bytes, iteration: int = 0) -> NBTTag:
-        tagId = unpack('>B', nbtData[:1])[0]
-        tag = NBTTagType(tagId)
-        if tag == NBTTagType.TAG_End:
-            return NBTTagEnd()
+    def parse(nbtData: bytes | bytearray | memoryview, iteration: int = 0, keepRaw: bool = False, recordOffsets: bool = False, nameTable: NBTNameTable | None = None) -> NBTTag:
+        '''
+        @param bytes nbtData
+        @param int iteration
+        @param bool keepRaw Keep the bytes each compound and list was parsed from, so that saving copies the unmodified
+                            ones verbatim instead of encoding them again. The data stays referenced by the tree, and is
+                            copied first unless it is an immutable bytes object.
+        @param bool recordOffsets Record the offset of the payload of each value tag in nbtData, for NBTPatcher
+        @param NBTNameTable|None nameTable Where tag names are decoded and shared, NBTNameTable.getDefault() if None
+
+        @return NBTTag
+        '''
 
-        nameLength = unpack('>H', nbtData[1:3])[0]
-        name = nbtData[3:3 + nameLength].decode('utf-8')
-        data = nbtData[3 + nameLength:]
+        if keepRaw and not isinstance(nbtData, bytes):
+            nbtData = bytes(nbtData)
 
-        if settings.debug:
-            print('> '.ljust(2 + iteration * 2, ' ') + f"Parsing tag [{tag}]" + (f" [name={name}]" if name else '') + "...")
+        return NBTParser.parseAt(memoryview(nbtData), 0, iteration, keepRaw, recordOffsets, nameTable)[0]
 
-        nbtTag = NBTParser.parseTag(tag, name, data, iteration)
+    @staticmethod
+    def parseAt(data: memoryview, offset: int = 0, iteration: int = 0, keepRaw: bool = False, recordOffsets: bool = False, nameTable: NBTNameTable | None = None) -> tuple[NBTTag, int]:
+        '''
+        Parses the tag starting at offset without copying the buffer.
 
-        if settings.debug:
-            print(('> '.ljust(2 + iteration * 2, ' ') + f"[{tag}] " + f"[name={name}] " if name else '') + "Done.")
+        @param memoryview data
+        @param int offset
+        @param int iteration
+        @param bool keepRaw Keep slices of data in the compounds and lists, the buffer must not change afterwards
+        @param bool recordOffsets Record the offset of the payload of each value tag in data
+        @param NBTNameTable|None nameTable
 
-        return nbtTag
+        @return tuple[NBTTag, int] The parsed tag and the number of bytes consumed
+        '''
+
+        try:
+            tag = _tagType(data[offset])
+            if tag == NBTTagType.TAG_End:
+                return NBTTagEnd(), 1
+
+            if nameTable is None:
+                nameTable = NBTNameTable.getDefault()
+
+            nameLength = USHORT.unpack_from(data, offset + 1)[0]
+            name = nameTable.decode(data, offset + 3, offset + 3 + nameLength)
+
+            if settings.debug:
+                print('> '.ljust(2 + iteration * 2, ' ') + f"Parsing tag [{tag}]" + (f" [name={name}]" if name else '') + "...")
+
+            nbtTag, length = NBTParser.parseTagAt(tag, name, data, offset + 3 + nameLength, iteration, keepRaw, recordOffsets, nameTable)
+
+            if settings.debug:
+                print(('> '.ljust(2 + iteration * 2, ' ') + f"[{tag}] " + f"[name={name}] " if name else '') + "Done.")
+
+            return nbtTag, 3 + nameLength + length
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+    @staticmethod
+    def parseTag(tag: NBTTagType, name: str, data: bytes | bytearray | memoryview, iteration: int = 0) -> NBTTag:
+        return NBTParser.parseTagAt(tag, name, memoryview(data), 0, iteration)[0]
 
     @staticmethod
-    def parseTag(tag: NBTTagType, name: str, data: bytes, iteration: int = 0) -> NBTTag:
-        payload = None
+    def parseTagAt(tag: NBTTagType, name: str, data: memoryview, offset: int = 0, iteration: int = 0, keepRaw: bool = False, recordOffsets: bool = False, nameTable: NBTNameTable | None = None) -> tuple[NBTTag, int]:
+        '''
+        Parses the payload of a tag of the given type starting at offset.
+        Compounds and lists are walked with an explicit stack, so the nesting depth is not bound by the recursion limit.
+
+        @param NBTTagType tag
+        @param str name
+        @param memoryview data
+        @param int offset
+        @param int iteration
+        @param bool keepRaw
+        @param bool recordOffsets
+        @param NBTNameTable|None nameTable
+
+        @return tuple[NBTTag, int] The parsed tag and the number of payload bytes consumed
+        '''
+
+        try:
+            debug = settings.debug
+            decodeName = (nameTable if nameTable is not None else NBTNameTable.getDefault()).decode
+            start = offset
+            # Each entry is an open container: [name, children, remaining elements (-1 for compounds), list type, payload offset]
+            stack: list[list] = []
+            # Containers below this depth hold a compound that dropped a repeated name, so their bytes don't describe them
+            staleDepth = 0
+
+            while True:
+                if tag == NBTTagType.TAG_Compound:
+                    stack.append([name, [], -1, None, offset])
+                elif tag == NBTTagType.TAG_List and data[offset] not in _PACKED_LISTS:
+                    # Every element takes at least one byte
+                    count = INT.unpack_from(data, offset + 1)[0]
+                    _checkLength(data, offset + 5, count, 1)
+
+                    stack.append([name, [], count, _tagType(data[offset]), offset])
+                    offset += 5
+                else:
+                    nbtTag, length = NBTParser._parseValueAt(tag, name, data, offset)
+                    if recordOffsets:
+                        nbtTag._offset = offset
+
+                    offset += length
+
+                    if not stack:
+                        return nbtTag, offset - start
+
+                    stack[-1][1].append(nbtTag)
+
+                # Move to the next tag, closing every finished container on the way
+                while True:
+                    frame = stack[-1]
+                    if frame[2] < 0:
+                        tagId = data[offset]
+                        if tagId != 0:
+                            tag = _tagType(tagId)
+                            nameLength = USHORT.unpack_from(data, offset + 1)[0]
+                            name = decodeName(data, offset + 3, offset + 3 + nameLength)
+                            offset += 3 + nameLength
+
+                            if debug:
+                                print('> '.ljust(2 + (iteration + len(stack)) * 2, ' ') + f"Parsing tag [{tag}]" + (f" [name={name}]" if name else '') + "...")
+
+                            break
 
+                        offset += 1
+                        nbtTag = NBTTagCompound(frame[0], frame[1])
+                    elif frame[2] > 0:
+                        frame[2] -= 1
+                        tag = frame[3]
+                        name = ''
+                        break
+                    else:
+                        nbtTag = NBTTagList(frame[0], frame[1], frame[3])
+
+                    stack.pop()
+
+                    if len(nbtTag._payload) != len(frame[1]) or len(stack) < staleDepth:
+                        staleDepth = len(stack)
+                    else:
+                        nbtTag._payloadSize = offset - frame[4]
+                        if keepRaw:
+                            nbtTag._raw = data[frame[4]:offset]
+
+                    if debug and frame[0]:
+                        print('> '.ljust(2 + (iteration + len(stack)) * 2, ' ') + f"[{nbtTag.getType()}] [name={frame[0]}] Done.")
+
+                    if not stack:
+                        return nbtTag, offset - start
+
+                    stack[-1][1].append(nbtTag)
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+    @staticmethod
+    def _parseValueAt(tag: NBTTagType, name: str, data: memoryview, offset: int) -> tuple[NBTNamedTag, int]:
         match tag:
             # 1 byte / 8 bits, signed
             case NBTTagType.TAG_Byte:
-                payload = unpack('>b', data[:1])[0]
-
-                return NBTTagByte(name, payload)
+                return NBTTagByte(name, BYTE.unpack_from(data, offset)[0]), 1
 
             # 2 bytes / 16 bits, signed
             case NBTTagType.TAG_Short:
-                payload = unpack('>h', data[:2])[0]
-
-                return NBTTagShort(name, payload)
+                return NBTTagShort(name, SHORT.unpack_from(data, offset)[0]), 2
 
             # 4 bytes / 32 bits, signed
             case NBTTagType.TAG_Int:
-                payload = unpack('>l', data[:4])[0]
-
-                return NBTTagInt(name, payload)
+                return NBTTagInt(name, INT.unpack_from(data, offset)[0]), 4
 
             # 8 bytes / 64 bits, signed
             case NBTTagType.TAG_Long:
-                payload = unpack('>q', data[:8])[0]
-
-                return NBTTagLong(name, payload)
+                return NBTTagLong(name, LONG.unpack_from(data, offset)[0]), 8
 
             # 4 bytes / 32 bits, signed, big endian, IEEE 754-2008, binary32
             case NBTTagType.TAG_Float:
-                payload = unpack('>f', data[:4])[0]
-
-                return NBTTagFloat(name, payload)
+                return NBTTagFloat(name, FLOAT.unpack_from(data, offset)[0]), 4
 
             # 8 bytes / 64 bits, signed, big endian, IEEE 754-2008, binary64
             case NBTTagType.TAG_Double:
-                payload = unpack('>d', data[:8])[0]
+                return NBTTagDouble(name, DOUBLE.unpack_from(data, offset)[0]), 8
 
-                return NBTTagDouble(name, payload)
+            # A TAG_Short-like, but instead unsigned payload length, then a UTF-8 str resembled by length bytes.
+            case NBTTagType.TAG_String:
+                payloadLength = USHORT.unpack_from(data, offset)[0]
+                _checkLength(data, offset + 2, payloadLength, 1)
+
+                return NBTTagString(name, encoded=bytes(data[offset + 2:offset + 2 + payloadLength])), 2 + payloadLength
 
             # TAG_Int's payload size, then size TAG_Byte's payloads.
             case NBTTagType.TAG_Byte_Array:
-                payload = []
+                payloadLength = INT.unpack_from(data, offset)[0]
+                _checkLength(data, offset + 4, payloadLength, 1)
 
-                payloadLength = unpack('>l', data[:4])[0]
+                return NBTTagByteArray(name, unpackArray('b', data, offset + 4, payloadLength)), 4 + payloadLength
 
-                for i in range(payloadLength):
-                    payload.append(NBTParser.parseTag(NBTTagType.TAG_Byte, '', data[4 + i:4 + i + 1], iteration + 1))
+            # TAG_Int's payload size, then size TAG_Int's payloads.
+            case NBTTagType.TAG_Int_Array:
+                payloadLength = INT.unpack_from(data, offset)[0]
+                _checkLength(data, offset + 4, payloadLength, 4)
 
-                return NBTTagByteArray(name, payload)
+                return NBTTagIntArray(name, unpackArray('i', data, offset + 4, payloadLength)), 4 + payloadLength * 4
 
-            # A TAG_Short-like, but instead unsigned payload length, then a UTF-8 str resembled by length bytes.
-            case NBTTagType.TAG_String:
-                payloadLength = unpack('>H', data[:2])[0]
-                payload = data[2:2 + payloadLength].decode('utf-8')
+            # TAG_Int's payload size, then size TAG_Long's payloads.
+            case NBTTagType.TAG_Long_Array:
+                payloadLength = INT.unpack_from(data, offset)[0]
+                _checkLength(data, offset + 4, payloadLength, 8)
 
-                return NBTTagString(name, payload)
+                return NBTTagLongArray(name, unpackArray('q', data, offset + 4, payloadLength)), 4 + payloadLength * 8
 
-            # TAG_Byte's payload tagId, then TAG_Int's payload size, then size tags' payloads, all of type tagId.
-            case NBTTagType.TAG_List:
-                payload = []
+            # A list of numbers: the type of the elements, TAG_Int's payload size, then size payloads, decoded at once.
+            case NBTTagType.TAG_List if data[offset] in _PACKED_LISTS:
+                payloadLength = INT.unpack_from(data, offset + 1)[0]
+                _checkLength(data, offset + 5, payloadLength, _FIXED_SIZES[data[offset]])
+                values = unpackArray(_PACKED_LISTS[data[offset]], data, offset + 5, payloadLength)
 
-                subtagId = unpack('>b', data[:1])[0]
-                subtag = NBTTagType(subtagId)
-                payloadLength = unpack('>l', data[1:5])[0]
-                payloadData = data[5:]
+                return NBTPackedTagList(name, values if values.typecode != 'f' else array('d', values), _TAG_TYPES[data[offset]]), 5 + payloadLength * values.itemsize
 
-                j = 0
-                for i in range(payloadLength):
-                    data = payloadData[j:]
-                    _tag = NBTParser.parseTag(subtag, '', data, iteration + 1)
-                    payload.append(_tag)
+        raise NBTException(f"{tag.name} is not a valid tag type.")
 
-                    j += _tag.getByteLength() - 1 - 2
+    @staticmethod
+    def skipPayload(tag: NBTTagType, data: memoryview, offset: int = 0, count: int = 1) -> int:
+        '''
+        Finds the end of count consecutive payloads of the given type without decoding them.
 
-                return NBTTagList(name, payload, subtag)
+        @param NBTTagType tag
+        @param memoryview data
+        @param int offset
+        @param int count
 
-            # Fully formed tags, followed by a TAG_End.
-            case NBTTagType.TAG_Compound:
-                payload = []
+        @return int The offset right after the last payload
+        '''
 
-                i = 0
-                while (_tag := NBTParser.parse(data[i:], iteration + 1)).getType() != NBTTagType.TAG_End:
-                    payload.append(_tag)
-                    i += _tag.getByteLength()
+        # Each entry is [tagId, remaining payloads], or [None, 0] while inside a compound
+        pending: list[list] = [[tag.value, count]]
+        try:
+            while pending:
+                top = pending[-1]
+                tagId = top[0]
+
+                if tagId is None:
+                    # Skip leaf children in place, only containers need a new stack entry
+                    while True:
+                        tagId = data[offset]
+                        if tagId == 0:
+                            offset += 1
+                            pending.pop()
+                            break
 
-                return NBTTagCompound(name, payload)
+                        offset += 3 + USHORT.unpack_from(data, offset + 1)[0]
+                        if tagId < 7:
+                            offset += _FIXED_SIZES[tagId]
+                        elif tagId == 8:
+                            offset += 2 + USHORT.unpack_from(data, offset)[0]
+                        elif tagId in _ARRAY_SIZES:
+                            length = INT.unpack_from(data, offset)[0]
+                            _checkLength(data, offset + 4, length, _ARRAY_SIZES[tagId])
+                            offset += 4 + length * _ARRAY_SIZES[tagId]
+                        else:
+                            pending.append([tagId, 1])
+                            break
 
-            # TAG_Int's payload size, then size TAG_Int's payloads.
-            case NBTTagType.TAG_Int_Array:
-                payload = []
+                    continue
+
+                remaining = top[1]
+                pending.pop()
+                if remaining == 0:
+                    continue
+
+                if tagId < 7:
+                    offset += _FIXED_SIZES[tagId] * remaining
+                elif tagId == 8:
+                    for _ in range(remaining):
+                        offset += 2 + USHORT.unpack_from(data, offset)[0]
+                elif tagId in _ARRAY_SIZES:
+                    size = _ARRAY_SIZES[tagId]
+                    for _ in range(remaining):
+                        length = INT.unpack_from(data, offset)[0]
+                        _checkLength(data, offset + 4, length, size)
+                        offset += 4 + length * size
+                elif tagId == 9:
+                    length = INT.unpack_from(data, offset + 1)[0]
+                    _checkLength(data, offset + 5, length, _FIXED_SIZES[data[offset]] if data[offset] < 7 else 1)
+                    pending.append([tagId, remaining - 1])
+                    pending.append([data[offset], length])
+                    offset += 5
+                elif tagId == 10:
+                    pending.append([tagId, remaining - 1])
+                    pending.append([None, 0])
+                else:
+                    raise NBTException(f"Invalid tag type: {tagId}")
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+        if offset > len(data):
+            raise NBTException("Unexpected end of NBT data.")
+
+        return offset
 
-                payloadLength = unpack('>l', data[:4])[0]
-                for i in range(payloadLength):
-                    payload.append(NBTParser.parseTag(NBTTagType.TAG_Int, '', data[4 + i * 4:4 + i * 4 + 4], iteration + 1))
+    @staticmethod
+    def parseLazy(nbtData: bytes | bytearray | memoryview) -> NBTTag:
+        '''
+        Parses a binary NBT, decoding compounds and lists of containers only when their children are accessed.
+        The returned tree keeps a reference to nbtData, which must not be modified afterwards.
+        '''
 
-                return NBTTagIntArray(name, payload)
+        return NBTParser.parseLazyAt(memoryview(nbtData), 0)[0]
 
-            # TAG_Int's payload size, then size TAG_Long's payloads.
-            case NBTTagType.TAG_Long_Array:
-                payload = []
+    @staticmethod
+    def parseLazyAt(data: memoryview, offset: int = 0) -> tuple[NBTTag, int]:
+        try:
+            tag = _tagType(data[offset])
+            if tag == NBTTagType.TAG_End:
+                return NBTTagEnd(), 1
 
-                payloadLength = unpack('>l', data[:4])[0]
-                for i in range(payloadLength):
-                    payload.append(NBTParser.parseTag(NBTTagType.TAG_Long, '', data[4 + i * 8:4 + i * 8 + 8], iteration + 1))
+            nameLength = USHORT.unpack_from(data, offset + 1)[0]
+            name = NBTNameTable.getDefault().decode(data, offset + 3, offset + 3 + nameLength)
 
-                return NBTTagLongArray(name, payload)
+            nbtTag, length = NBTParser.parseLazyTagAt(tag, name, data, offset + 3 + nameLength)
 
-            case NBTTagType.TAG_End:
-                raise NBTException("TAG_End is not a valid tag type.")
+            return nbtTag, 3 + nameLength + length
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+    @staticmethod
+    def parseLazyTagAt(tag: NBTTagType, name: str, data: memoryview, offset: int = 0) -> tuple[NBTTag, int]:
+        '''
+        Same as parseTagAt, but compounds and lists of containers only record where their children are.
+
+        @return tuple[NBTTag, int] The parsed tag and the number of payload bytes consumed
+        '''
+
+        try:
+            match tag:
+                case NBTTagType.TAG_Compound:
+                    children: dict[str, tuple[NBTTagType, int, int, int]] = {}
+                    decodeName = NBTNameTable.getDefault().decode
+                    repeated = False
+
+                    i = offset
+                    while (tagId := data[i]) != 0:
+                        nameLength = USHORT.unpack_from(data, i + 1)[0]
+                        childName = decodeName(data, i + 3, i + 3 + nameLength)
+                        childTag = _tagType(tagId)
+                        end = NBTParser.skipPayload(childTag, data, i + 3 + nameLength)
+
+                        repeated = repeated or childName in children
+                        children[childName] = (childTag, i, i + 3 + nameLength, end)
+                        i = end
+
+                    nbtTag = NBTLazyTagCompound(name, data, offset, i + 1, children)
+                    if repeated:
+                        # The bytes also hold the children dropped for their repeated name, so they can neither be copied
+                        # nor give the size
+                        nbtTag._materialize()
+                        nbtTag._payloadSize = None
+
+                    return nbtTag, i + 1 - offset
+
+                case NBTTagType.TAG_List:
+                    subtag = _tagType(data[offset])
+                    if subtag.size() >= 0:
+                        return NBTParser.parseTagAt(tag, name, data, offset)
+
+                    payloadLength = INT.unpack_from(data, offset + 1)[0]
+                    _checkLength(data, offset + 5, payloadLength, 1)
+                    offsets = []
+
+                    j = offset + 5
+                    for i in range(payloadLength):
+                        offsets.append(j)
+                        j = NBTParser.skipPayload(subtag, data, j)
+
+                    return NBTLazyTagList(name, data, offset, j, subtag, offsets), j - offset
+
+            return NBTParser.parseTagAt(tag, name, data, offset)
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+    @staticmethod
+    def parsePaths(nbtData: bytes | bytearray | memoryview, paths: list[list[str]]) -> list[NBTNamedTag | None]:
+        '''
+        Decodes only the tags at the given NBTUtils-style key paths (e.g. ['Data', 'Player', 'Inventory'] or
+        ['Items', '[0]']), skipping everything else using the length prefixes.
+        Scanning stops as soon as every path has been found.
+
+        @param bytes nbtData
+        @param list[list[str]] paths
+
+        @return list[NBTNamedTag|None] The tag at each path, or None if the path doesn't exist
+        '''
+
+        data = memoryview(nbtData)
+        results: list[NBTNamedTag | None] = [None] * len(paths)
+
+        # Tree of the requested keys, the None entry of a node lists the paths ending there
+        tree: dict = {}
+        for index, path in enumerate(paths):
+            node = tree
+            for part in path:
+                node = node.setdefault(part.strip('"'), {})
+
+            node.setdefault(None, []).append(index)
+
+        try:
+            tag = _tagType(data[0])
+            if tag == NBTTagType.TAG_End or not paths:
+                return results
+
+            offset = 3 + USHORT.unpack_from(data, 1)[0]
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+        NBTParser._parsePathsAt(tag, str(data[3:offset], 'utf-8'), data, offset, tree, paths, results, [NBTParser._countPaths(tree)], 0)
+
+        return results
+
+    @staticmethod
+    def _countPaths(node: dict) -> int:
+        # A decoded tag resolves every path below it, so only the topmost path ends are counted
+        count = 0
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if None in node:
+                count += 1
+            else:
+                pending.extend(node.values())
+
+        return count
+
+    @staticmethod
+    def _resolvePaths(tag: NBTNamedTag, node: dict, paths: list[list[str]], results: list[NBTNamedTag | None], depth: int) -> None:
+        from lib.nbt import NBTUtils
+
+        pending = [node]
+        while pending:
+            for key, child in pending.pop().items():
+                if key is not None:
+                    pending.append(child)
+                    continue
+
+                for index in child:
+                    try:
+                        results[index] = NBTUtils.getWalking(tag, paths[index][depth:])
+                    except (NBTException, ValueError, IndexError):
+                        results[index] = None
+
+    @staticmethod
+    def _parsePathsAt(tag: NBTTagType, name: str, data: memoryview, offset: int, node: dict, paths: list[list[str]], results: list[NBTNamedTag | None], remaining: list[int], depth: int) -> int:
+        '''
+        Walks the containers on the requested paths with an explicit stack, so the nesting depth is not bound by the
+        recursion limit.
+
+        @return int The end of the payload, or -1 once every path has been found
+        '''
+
+        # Each entry is an open container on a path: [wanted children, depth of the children, list type (None for
+        # compounds), number of elements, index of the next element]
+        stack: list[list] = []
+
+        try:
+            while True:
+                if None in node or tag not in (NBTTagType.TAG_Compound, NBTTagType.TAG_List):
+                    nbtTag, length = NBTParser.parseTagAt(tag, name, data, offset)
+                    NBTParser._resolvePaths(nbtTag, node, paths, results, depth)
+
+                    remaining[0] -= NBTParser._countPaths(node)
+                    if remaining[0] <= 0:
+                        return -1
+
+                    offset += length
+                elif tag == NBTTagType.TAG_Compound:
+                    stack.append([{key.encode('utf-8'): child for key, child in node.items()}, depth + 1, None, 0, 0])
+                else:
+                    payloadLength = INT.unpack_from(data, offset + 1)[0]
+                    _checkLength(data, offset + 5, payloadLength, 1)
+
+                    wanted = {int(key[1:-1]): child for key, child in node.items() if re.match(r'^\[(\d+)\]$', key)}
+                    stack.append([wanted, depth + 1, _tagType(data[offset]), payloadLength, 0])
+                    offset += 5
+
+                # Move to the next tag on a path, skipping the others and closing every finished container on the way
+                while True:
+                    if not stack:
+                        return offset
+
+                    frame = stack[-1]
+                    if frame[2] is None:
+                        tagId = data[offset]
+                        if tagId == 0:
+                            offset += 1
+                            stack.pop()
+                            continue
+
+                        payloadOffset = offset + 3 + USHORT.unpack_from(data, offset + 1)[0]
+                        node = frame[0].get(bytes(data[offset + 3:payloadOffset]))
+                        if node is None:
+                            offset = NBTParser.skipPayload(_tagType(tagId), data, payloadOffset)
+                            continue
+
+                        tag, name = _tagType(tagId), str(data[offset + 3:payloadOffset], 'utf-8')
+                        offset = payloadOffset
+                    else:
+                        index = frame[4]
+                        if index == frame[3] or not frame[0]:
+                            offset = NBTParser.skipPayload(frame[2], data, offset, frame[3] - index)
+                            stack.pop()
+                            continue
+
+                        frame[4] += 1
+                        node = frame[0].pop(index, None)
+                        if node is None:
+                            offset = NBTParser.skipPayload(frame[2], data, offset)
+                            continue
+
+                        tag, name = frame[2], ''
+
+                    depth = frame[1]
+                    break
+        except (IndexError, struct.error):
+            raise NBTException("Unexpected end of NBT data.")
+
+    @staticmethod
+    def parseFile(file: str | PathLike | BinaryIO, bufferSize: int = 65536, keepRaw: bool = False) -> NBTTag:
+        '''
+        Parses a binary NBT file compressed with gzip, zlib or not compressed at all.
+        The file is decompressed and parsed a block at a time, so neither the compressed nor the decompressed data is
+        held in memory as a whole, unless keepRaw is set.
+
+        @param str|PathLike|BinaryIO file A path or a binary file object
+        @param int bufferSize
+        @param bool keepRaw See parse
+
+        @return NBTTag
+        '''
+
+        if isinstance(file, (str, PathLike)):
+            with open(file, 'rb', buffering=bufferSize) as stream:
+                return NBTParser.parseFile(stream, bufferSize, keepRaw)
+
+        stream = NBTCompression.peek(file).open(file, bufferSize)
+        if keepRaw:
+            return NBTParser.parse(stream.read(), keepRaw=True)
+
+        return NBTParser.parseStream(stream, bufferSize)
+
+    @staticmethod
+    def parseStream(stream: BinaryIO, bufferSize: int = 65536) -> NBTTag:
+        '''
+        Builds a tag tree from an uncompressed binary NBT stream, reading it through NBTReader.
+
+        @param BinaryIO stream
+        @param int bufferSize
+
+        @return NBTTag
+        '''
+
+        # Each entry is an open container: [name, children, list type (None for compounds)]
+        stack: list[list] = []
+
+        for event in NBTReader(stream, bufferSize):
+            match event.event:
+                case NBTEventType.START_COMPOUND:
+                    stack.append([event.name, [], None])
+                    continue
+
+                case NBTEventType.START_LIST:
+                    stack.append([event.name, [], event.tagType])
+                    continue
+
+                case NBTEventType.VALUE:
+                    nbtTag = _VALUE_TAGS[event.tagType.value](event.name, event.payload)
+
+                case NBTEventType.END:
+                    name, children, listType = stack.pop()
+                    nbtTag = NBTTagCompound(name, children) if listType is None else NBTTagList(name, children, listType)
+
+            if not stack:
+                return nbtTag
+
+            stack[-1][1].append(nbtTag)
+
+        return NBTTagEnd()
 
     @staticmethod
     def parseSNBT(snbtStr: str) -> NBTTag:
-        snbtStr = snbtStr.strip()
+        tag, end = NBTParser.parseSNBTAt(snbtStr)
+
+        end = _SNBT_WHITESPACE.match(snbtStr, end).end()
+        if end < len(snbtStr):
+            raise NBTException(f"Unexpected data after the root tag at {end}.")
+
+        return tag
+
+    @staticmethod
+    def parseSNBTStream(stream: TextIO, bufferSize: int = 65536) -> NBTTag:
+        '''
+        Parses SNBT from a text stream, reading it a block at a time.
+        Only a bounded window of the input is held in memory, which is enough for any string NBT can store.
+
+        @param TextIO stream
+        @param int bufferSize
+
+        @return NBTTag
+        '''
+
+        tag, data, pos, base = NBTParser._parseSNBT('', 0, '', None, stream, bufferSize)
+
+        while True:
+            pos = _SNBT_WHITESPACE.match(data, pos).end()
+            if pos < len(data):
+                raise NBTException(f"Unexpected data after the root tag at {base + pos}.")
 
-        return NBTParser.parseSNBTTag(snbtStr)
+            base += len(data)
+            data = stream.read(bufferSize)
+            pos = 0
+            if not data:
+                return tag
 
     @staticmethod
     def parseSNBTTag(data: str, name: str = '', iteration: int = 0, forceType: NBTTagType | None = None) -> NBTNamedTag:
+        return NBTParser.parseSNBTAt(data, 0, name, forceType)[0]
+
+    @staticmethod
+    def parseSNBTAt(data: str, offset: int = 0, name: str = '', forceType: NBTTagType | None = None) -> tuple[NBTNamedTag, int]:
         '''
+        Parses the SNBT value starting at offset.
+        The input is scanned with a single position index, and compounds and lists are walked with an explicit stack,
+        so neither the input size nor the nesting depth make parsing slower than linear.
         Since this is parsing a SNBT, we can assume that no tag will be TAG_End.
 
         @param str data
+        @param int offset
         @param str name
-        @param NBTTagType|null forceType
+        @param NBTTagType|null forceType Type of the value if it is a number without suffix
+
+        @return tuple[NBTNamedTag, int] The parsed tag and the offset right after it
+        '''
+
+        tag, _, pos, _ = NBTParser._parseSNBT(data, offset, name, forceType, None, 0)
+
+        return tag, pos
 
-        @return NBTNamedTag
+    @staticmethod
+    def _parseSNBT(data: str, pos: int, name: str, forceType: NBTTagType | None, stream: TextIO | None, bufferSize: int) -> tuple[NBTNamedTag, str, int, int]:
+        '''
+        Scanner behind parseSNBTAt and parseSNBTStream.
+        With a stream, data is a window of the input that is refilled whenever fewer than _SNBT_LOOKAHEAD characters
+        are left after pos, so that every token (at most a string of 65535 escaped characters) is whole in the window.
+
+        @return tuple[NBTNamedTag, str, int, int] The parsed tag, the last window, the offset right after the tag in it
+                                                 and the offset of the window in the input
         '''
 
-        length: int = len(data)
+        debug = settings.debug
+        skip = _SNBT_WHITESPACE.match
+        # Offset of the window in the input, and the position past which it must be refilled
+        base = 0
+        limit = len(data) if stream is None else -1
+        # Each entry is an open container: [closing bracket, name, children]
+        stack: list[list] = []
 
-        if settings.debug:
-            print('> '.ljust(2 + iteration * 2, ' ') + "Parsing tag" + (f" [name={name}]" if name else '') + "...")
+        def refill(data: str, pos: int) -> tuple[str, int, int]:
+            nonlocal base
+
+            chunk = stream.read(bufferSize)
+            base += pos
+            data = data[pos:] + chunk
+
+            return data, 0, len(data) - _SNBT_LOOKAHEAD if chunk else len(data)
 
         try:
-            i = 0
-            while data[i] == ' ' or data[i] == "\t" or data[i] == "\n" or data[i] == "\r":
-                i += 1
+            while True:
+                if debug:
+                    print('> '.ljust(2 + len(stack) * 2, ' ') + "Parsing tag" + (f" [name={name}]" if name else '') + "...")
+
+                pos = skip(data, pos).end()
+                while pos > limit:
+                    data, pos, limit = refill(data, pos)
+                    pos = skip(data, pos).end()
+
+                char = data[pos]
+                tag = None
+
+                if char == '{':
+                    stack.append(['}', name, []])
+                    pos += 1
+                elif char == '[':
+                    pos = skip(data, pos + 1).end()
+                    while pos > limit:
+                        data, pos, limit = refill(data, pos)
+                        pos = skip(data, pos).end()
+
+                    if data[pos + 1:pos + 2] == ';' and data[pos] in _SNBT_ARRAYS:
+                        tag, data, pos, limit = NBTParser._parseSNBTArray(data, pos, name, limit, refill)
+                    elif data[pos] in _SNBT_NUMBER_START:
+                        tag, pos = NBTParser._parseSNBTNumberList(data, pos, name)
+
+                    if tag is None:
+                        stack.append([']', name, []])
+                else:
+                    tag, pos = NBTParser._parseSNBTValue(data, pos, name, forceType)
+
+                forceType = None
+
+                # Look for the next value, closing every finished container on the way
+                while True:
+                    if not stack:
+                        return tag, data, pos, base
+
+                    frame = stack[-1]
+                    pos = skip(data, pos).end()
+                    while pos > limit:
+                        data, pos, limit = refill(data, pos)
+                        pos = skip(data, pos).end()
+
+                    if tag is not None:
+                        frame[2].append(tag)
+                        tag = None
+
+                        if data[pos] == ',':
+                            pos = skip(data, pos + 1).end()
+                            while pos > limit:
+                                data, pos, limit = refill(data, pos)
+                                pos = skip(data, pos).end()
+                        elif data[pos] != frame[0]:
+                            raise NBTException(f"Expected ',' or '{frame[0]}' at {base + pos}, found '{data[pos]}'.")
+
+                    if data[pos] == frame[0]:
+                        pos += 1
+                        stack.pop()
+
+                        if debug and frame[1]:
+                            print('> '.ljust(2 + len(stack) * 2, ' ') + f"[name={frame[1]}] Done.")
+
+                        if frame[0] == '}':
+                            tag = NBTTagCompound(frame[1], frame[2])
+                        else:
+                            # Minecraft uses TAG_End for empty lists.
+                            try:
+                                tag = NBTTagList(frame[1], frame[2], frame[2][0].getType() if frame[2] else NBTTagType.TAG_End)
+                            except (TypeError, OverflowError) as e:
+                                raise NBTException(f"Invalid list elements: {e}.")
+
+                        continue
+
+                    if frame[0] == ']':
+                        name = ''
+                        break
+
+                    if data[pos] == '"' or data[pos] == "'":
+                        name, pos = NBTParser._scanSNBTString(data, pos)
+                        pos = skip(data, pos).end()
+                        while pos > limit:
+                            data, pos, limit = refill(data, pos)
+                            pos = skip(data, pos).end()
+                    else:
+                        colon = data.find(':', pos)
+                        if colon < 0:
+                            raise NBTException(f"Expected a key at {base + pos}.")
+
+                        name = data[pos:colon].rstrip()
+                        pos = colon
+
+                    if data[pos] != ':':
+                        raise NBTException(f"Expected ':' at {base + pos}, found '{data[pos]}'.")
+
+                    pos += 1
+                    break
+        except IndexError:
+            raise NBTException("Unexpected end of SNBT data.")
 
-            match (data[i]):
-                case '[':
-                    payload = []
+    @staticmethod
+    def _scanSNBTString(data: str, pos: int) -> tuple[str, int]:
+        '''
+        Reads the quoted string starting at pos, resolving its escape sequences.
 
-                    j = i + 1
-                    while (data[j] == ' ' or data[j] == "\t" or data[j] == "\n" or data[j] == "\r"):
-                        j += 1
+        @return tuple[str, int] The string and the offset right after the closing quote
+        '''
 
-                    _tag = None
-                    if ((data[j] == 'B' or data[j] == 'I' or data[j] == 'L') and data[j + 1] == ';'):
-                        match (data[j]):
-                            case 'B':
-                                _tag = NBTTagType.TAG_Byte
+        quote = data[pos]
+        start = pos + 1
+        parts = []
+        while True:
+            end = data.find(quote, start)
+            if end < 0:
+                raise NBTException(f"Unterminated string starting at {pos}.")
 
-                            case 'I':
-                                _tag = NBTTagType.TAG_Int
+            escape = data.find('\\', start, end)
+            if escape < 0:
+                parts.append(data[start:end])
+                return ''.join(parts), end + 1
 
-                            case 'L':
-                                _tag = NBTTagType.TAG_Long
+            parts.append(data[start:escape])
+            parts.append(data[escape + 1])
+            start = escape + 2
 
-                        j += 2
+    @staticmethod
+    def _parseSNBTValue(data: str, pos: int, name: str, forceType: NBTTagType | None = None) -> tuple[NBTNamedTag, int]:
+        if data[pos] == '"' or data[pos] == "'":
+            value, pos = NBTParser._scanSNBTString(data, pos)
+            return NBTTagString(name, value), pos
 
-                    k = j
-                    while data[k] != ']':
-                        while (data[k] == ' ' or data[k] == "\t" or data[k] == "\n" or data[k] == "\r"):
-                            k += 1
+        match = _SNBT_UNQUOTED.match(data, pos)
+        if match is None:
+            raise NBTException(f"Unexpected character '{data[pos]}' at {pos}.")
 
-                        if data[k] == ']':
-                            break
+        token = match.group()
 
-                        if data[k] == ',':
-                            k += 1
-                            continue
+        number = _SNBT_INTEGER.fullmatch(token)
+        if number is not None:
+            match number.group(1):
+                case 'b' | 'B':
+                    return NBTTagByte(name, int(number.group(0)[:-1])), match.end()
 
-                        tag = NBTParser.parseSNBTTag(data[k:], '', iteration + 1, _tag)
-                        k += tag.getAdditionalMetadata()['byteLength']
+                case 's' | 'S':
+                    return NBTTagShort(name, int(number.group(0)[:-1])), match.end()
 
-                        payload.append(tag)
+                case 'l' | 'L':
+                    return NBTTagLong(name, int(number.group(0)[:-1])), match.end()
 
-                    match (data[i + 1:i + 1 + 2]):
-                        case 'B':
-                            return NBTTagByteArray(name, payload, {'byteLength': k - i + 4})
+            if forceType == NBTTagType.TAG_Float or forceType == NBTTagType.TAG_Double:
+                return _SNBT_NUMBERS[forceType](name, float(token)), match.end()
+            elif forceType in _SNBT_NUMBERS:
+                return _SNBT_NUMBERS[forceType](name, int(token)), match.end()
 
-                        case 'I':
-                            return NBTTagIntArray(name, payload, {'byteLength': k - i + 4})
+            return NBTTagInt(name, int(token)), match.end()
 
-                        case 'L':
-                            return NBTTagLongArray(name, payload, {'byteLength': k - i + 4})
+        number = _SNBT_DECIMAL.fullmatch(token)
+        if number is not None:
+            match number.group(1):
+                case 'f' | 'F':
+                    return NBTTagFloat(name, float(token[:-1])), match.end()
 
-                    # Minecraft uses TAG_End for empty lists.
-                    return NBTTagList(name, payload, payload[0].getType() if len(payload) > 0 else NBTTagType.TAG_End, {'byteLength': k - i + 2})
+                case 'd' | 'D':
+                    return NBTTagDouble(name, float(token[:-1])), match.end()
 
-                case '{':
-                    payload = []
+            if forceType == NBTTagType.TAG_Float:
+                return NBTTagFloat(name, float(token)), match.end()
 
-                    j = i + 1
-                    while (data[j] != '}'):
-                        while (data[j] == ' ' or data[j] == "\t" or data[j] == "\n" or data[j] == "\r"):
-                            j += 1
+            return NBTTagDouble(name, float(token)), match.end()
 
-                        if data[j] == '}':
-                            break
+        if token == 'true' or token == 'false':
+            return NBTTagByte(name, 1 if token == 'true' else 0), match.end()
 
-                        if data[j] == ',':
-                            j += 1
-                            continue
+        return NBTTagString(name, token), match.end()
 
-                        if data[j] == '"':
-                            j += 1
-                            k = j
-                            while (data[k] != '"'):
-                                k += 1
-                        else:
-                            k = j
-                            while (data[k] != ':'):
-                                k += 1
+    @staticmethod
+    def _parseSNBTNumbers(span: str, parser: Callable) -> list:
+        '''
+        Converts a validated run of comma separated numbers in one go.
+        '''
 
-                        tagName = data[j:k]
-                        if data[k] == '"':
-                            k += 1
+        parts = span.translate(_SNBT_SUFFIXES).split(',')
+        if not parts[-1].strip():
+            parts.pop()
 
-                        j = k + 1
-                        while (data[j] == ' ' or data[j] == "\t" or data[j] == "\n" or data[j] == "\r"):
-                            j += 1
+        return list(map(parser, parts))
 
-                        tag = NBTParser.parseSNBTTag(data[j:], tagName, iteration + 1)
-                        j += tag.getAdditionalMetadata()['byteLength']
+    @staticmethod
+    def _extendSNBTArray(values: array, span: str, arrayType: type) -> None:
+        '''
+        Appends a validated run of typed array elements, the array itself checking their range.
+        '''
 
-                        #payload[tag.getName()] = tag
-                        payload.append(tag)
+        try:
+            values.extend(array(values.typecode, NBTParser._parseSNBTNumbers(span, int)))
+        except OverflowError:
+            raise NBTException(f"Value out of range for {arrayType._type.name}.")
 
-                    return NBTTagCompound(name, payload, {'byteLength': j - i + 2})
+    @staticmethod
+    def _parseSNBTNumberList(data: str, pos: int, name: str) -> tuple[NBTTagList | None, int]:
+        '''
+        Parses a list of numbers of the same type in bulk, pos being at its first element.
+        Anything else, like nested values or mixed types, is left to the generic scanner.
 
-                case '"':
-                    j = i + 1
-                    while (data[j] != '"' or data[j - 1] == "\\"):
-                        j += 1
+        @return tuple[NBTTagList|None, int] The list and the offset right after it, or None and pos
+        '''
 
-                    return NBTTagString(name, data[i + 1:j], {'byteLength': j - 1 + 2})
+        end = data.find(']', pos)
+        if end < 0:
+            return None, pos
 
-                case "'":
-                    j = i + 1
-                    while (data[j] != "'" or data[j - 1] == "\\"):
-                        j += 1
+        first = NBTParser._parseSNBTValue(data, pos, '')[0]
+        pattern, parser = _SNBT_NUMBER_LISTS.get(first.getType(), (None, None))
+        if pattern is None or pattern.fullmatch(data, pos, end) is None:
+            return None, pos
 
-                    return NBTTagString(name, data[i + 1:j - 1], {'byteLength': j - 1 + 2})
+        values = NBTParser._parseSNBTNumbers(data[pos:end], parser)
 
-                case _:
-                    j = i
+        try:
+            return NBTTagList(name, values, first.getType()), end + 1
+        except OverflowError:
+            raise NBTException(f"Value out of range for {first.getTypeName()}.")
 
-                    k = j + 1
-                    while k < length and (data[k].isdigit() or data[k] == '-' or data[k] == '+' or data[k] == '.'):
-                        k += 1
+    @staticmethod
+    def _parseSNBTArray(data: str, pos: int, name: str, limit: int, refill: Callable) -> tuple[NBTNamedTag, str, int, int]:
+        '''
+        Parses a typed array, pos being at its B, I or L prefix.
+        The elements are validated with a single regex and converted in bulk, a window at a time for streams.
+        '''
 
-                    num = data[j:k]
+        arrayType, pattern = _SNBT_ARRAYS[data[pos]]
+        values = array(arrayType._typecode)
+        pos += 2
 
-                    if k < length:
-                        match data[k]:
-                            case 'b' | 'B':
-                                return NBTTagByte(name, int(num), {'byteLength': k - j + 1})
+        while True:
+            end = data.find(']', pos)
+            if end < 0:
+                if limit >= len(data):
+                    raise NBTException("Unexpected end of SNBT data.")
 
-                            case 's' | 'S':
-                                return NBTTagShort(name, int(num), {'byteLength': k - j + 1})
+                # Convert the elements that are whole in the window, then move on
+                cut = data.rfind(',', pos)
+                if cut >= 0:
+                    if pattern.fullmatch(data, pos, cut + 1) is None:
+                        raise NBTException(f"Invalid {arrayType._type.name} elements: '{data[pos:pos + 20]}...'.")
 
-                            case 'l' | 'L':
-                                return NBTTagLong(name, int(num), {'byteLength': k - j + 1})
+                    NBTParser._extendSNBTArray(values, data[pos:cut], arrayType)
+                    pos = cut + 1
 
-                            case 'f' | 'F':
-                                return NBTTagFloat(name, float(num), {'byteLength': k - j + 1})
+                data, pos, limit = refill(data, pos)
+                continue
 
-                            case 'd' | 'D':
-                                return NBTTagDouble(name, float(num), {'byteLength': k - j + 1})
+            if pattern.fullmatch(data, pos, end) is None:
+                raise NBTException(f"Invalid {arrayType._type.name} elements: '{data[pos:min(end, pos + 20)]}...'.")
 
-                    if forceType == NBTTagType.TAG_Int or forceType is None and re.match(r"[-+]?\d+$", num) is not None:
-                        return NBTTagInt(name, int(num), {'byteLength': k - j})
+            NBTParser._extendSNBTArray(values, data[pos:end], arrayType)
 
-                    return NBTTagDouble(name, float(num), {'byteLength': k - j})
-        finally:
-            if settings.debug:
-                print('> '.ljust(2 + iteration * 2, ' ') + "" + (f"[name={name}] " if name else '') + "Done.")
+            return arrayType(name, values), data, end + 1, limit
@@ -0,0 +1,137 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import mmap
+from os import PathLike
+
+from lib.nbt import NBTNamedTag, NBTException, NBTCompression
+from lib.nbt.NBTBinary import INT, packArrayInto
+from lib.nbt.tag import NBTPackedTagList, NBTTypedArray
+
+
+class NBTPatcher:
+    '''
+    Writes modified fixed-width values (TAG_Byte to TAG_Double, and typed arrays or lists of numbers of unchanged
+    length) back into uncompressed binary NBT, without rewriting anything else.
+
+    The tags must come from NBTParser.parse with recordOffsets set. As offsets are those of the parsed data, the tree
+    must not have gone through any change that alters the size of the document (renames, strings, added or removed
+    tags) before patching.
+
+    The target is either a path, which is memory-mapped, or a writable buffer like a bytearray or an mmap. baseOffset
+    is where the parsed data starts in the target, e.g. the start of an uncompressed chunk in a region file.
+    '''
+
+    def __init__(self, target: str | PathLike | bytearray | memoryview | mmap.mmap, baseOffset: int = 0):
+        self._file = None
+        self._mmap = None
+
+        if isinstance(target, (str, PathLike)):
+            self._file = open(target, 'r+b')
+            try:
+                self._mmap = mmap.mmap(self._file.fileno(), 0)
+            except BaseException:
+                self._file.close()
+                raise
+
+            target = self._mmap
+
+        self._buffer = memoryview(target).cast('B')
+        self._baseOffset = baseOffset
+
+        if self._buffer.readonly:
+            self.close()
+            raise NBTException("The patch target is read-only.")
+        elif baseOffset == 0 and NBTCompression.detect(self._buffer[:2]) != NBTCompression.NONE:
+            self.close()
+            raise NBTException("Only uncompressed NBT can be patched in place.")
+
+    def __enter__(self) -> 'NBTPatcher':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _position(self, tag: NBTNamedTag) -> int:
+        if tag.getOffset() is None:
+            raise NBTException(f"The offset of tag '{tag.getName()}' was not recorded.")
+
+        return self._baseOffset + tag.getOffset()
+
+    def patch(self, tag: NBTNamedTag) -> None:
+        '''
+        Writes the current payload of a fixed-width tag, a typed array or a list of numbers at its original offset.
+
+        @param NBTNamedTag tag
+        '''
+
+        position = self._position(tag)
+
+        if isinstance(tag, NBTTypedArray):
+            payload = tag.getPayload()
+            if INT.unpack_from(self._buffer, position)[0] != len(payload):
+                raise NBTException(f"The length of array '{tag.getName()}' changed, it can't be patched in place.")
+
+            packArrayInto(payload, self._buffer, position + 4)
+        elif isinstance(tag, NBTPackedTagList):
+            if INT.unpack_from(self._buffer, position + 1)[0] != len(tag):
+                raise NBTException(f"The length of list '{tag.getName()}' changed, it can't be patched in place.")
+
+            tag._writePayload(self._buffer, position)
+        elif tag._struct is not None:
+            tag._struct.pack_into(self._buffer, position, tag.getPayload())
+        else:
+            raise NBTException(f"{tag.getTypeName()} is not a fixed-width tag.")
+
+    def patchElement(self, tag: NBTTypedArray | NBTPackedTagList, index: int) -> None:
+        '''
+        Writes a single element of a typed array or of a list of numbers at its original offset.
+
+        @param NBTTypedArray|NBTPackedTagList tag
+        @param int index
+        '''
+
+        position = self._position(tag)
+        payload = tag.getPayload()
+
+        if isinstance(tag, NBTPackedTagList):
+            # Skip the type of the elements
+            position += 1
+            elementType = tag._elementClass()
+        else:
+            elementType = tag._elementType
+
+        if index < 0 or index >= INT.unpack_from(self._buffer, position)[0]:
+            raise IndexError(f'Index out of bounds: {index}')
+
+        elementType._struct.pack_into(self._buffer, position + 4 + index * elementType._struct.size, payload[index])
+
+    def flush(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        self._buffer.release()
+
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
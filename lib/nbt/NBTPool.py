@@ -0,0 +1,136 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from os import PathLike
+from typing import Any
+
+from lib.nbt import NBTTag, NBTCompression, NBTParser, NBTRegion
+
+
+# Regions opened by the current worker process, so that a region is mapped once per worker instead of once per chunk
+_regions: dict[str | PathLike, NBTRegion] = {}
+
+
+def _parseFile(file: str | PathLike) -> NBTTag:
+    with open(file, 'rb') as stream:
+        data = stream.read()
+
+    return NBTParser.parse(NBTCompression.detect(data).decompress(data))
+
+
+def _parseChunk(region: str | PathLike, x: int, z: int) -> NBTTag | None:
+    if region not in _regions:
+        _regions[region] = NBTRegion(region)
+
+    return _regions[region].getChunk(x, z)
+
+
+def _runFiles(files: list[str | PathLike], func: Callable[[NBTTag], Any] | None) -> list:
+    if func is None:
+        return [_parseFile(file) for file in files]
+
+    return [func(_parseFile(file)) for file in files]
+
+
+def _runChunks(region: str | PathLike, coordinates: list[tuple[int, int]], func: Callable[[NBTTag], Any] | None) -> list:
+    if func is None:
+        return [_parseChunk(region, x, z) for x, z in coordinates]
+
+    return [func(_parseChunk(region, x, z)) for x, z in coordinates]
+
+
+class NBTPool:
+    '''
+    Parses files or region chunks on a pool of worker processes.
+
+    Workers only receive paths and chunk coordinates, and parse the data themselves with NBTParser.parse.
+    Each result is whatever func returns for the parsed tag, or the tag itself when no func is given; as results are
+    pickled back to the caller, returning only the data needed is much faster than returning whole trees.
+    func must be picklable, i.e. defined at the top level of a module.
+    '''
+
+    def __init__(self, workers: int | None = None, chunkSize: int = 1):
+        '''
+        @param int|None workers Number of worker processes, defaults to the number of CPUs
+        @param int chunkSize Number of files or chunks sent to a worker at a time
+        '''
+
+        if chunkSize < 1:
+            raise ValueError("chunkSize must be at least 1")
+
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._chunkSize = chunkSize
+
+    def __enter__(self) -> 'NBTPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def _collect(self, batches: list[tuple[list, Future]], ordered: bool) -> Iterator[tuple[Any, Any]]:
+        if ordered:
+            for items, future in batches:
+                yield from zip(items, future.result())
+        else:
+            items = {future: items for items, future in batches}
+            for future in as_completed(items):
+                yield from zip(items[future], future.result())
+
+    def mapFiles(self, files: Iterable[str | PathLike], func: Callable[[NBTTag], Any] | None = None, ordered: bool = True) -> Iterator[tuple[str | PathLike, Any]]:
+        '''
+        Parses binary NBT files (gzip, zlib or uncompressed).
+
+        @param Iterable[str|PathLike] files
+        @param Callable|None func Called on each parsed tag inside the worker
+        @param bool ordered Yield the results in the order of files, or as soon as they are ready
+
+        @return Iterator[tuple[str|PathLike, Any]] Each file with its result
+        '''
+
+        files = list(files)
+        batches = []
+        for i in range(0, len(files), self._chunkSize):
+            batch = files[i:i + self._chunkSize]
+            batches.append((batch, self._executor.submit(_runFiles, batch, func)))
+
+        return self._collect(batches, ordered)
+
+    def mapRegion(self, region: str | PathLike, func: Callable[[NBTTag], Any] | None = None, ordered: bool = True) -> Iterator[tuple[int, int, Any]]:
+        '''
+        Parses every chunk present in a region file.
+
+        @param str|PathLike region
+        @param Callable|None func Called on each parsed chunk inside the worker
+        @param bool ordered Yield the results in file header order, or as soon as they are ready
+
+        @return Iterator[tuple[int, int, Any]] The relative coordinates of each chunk with its result
+        '''
+
+        with NBTRegion(region) as regionFile:
+            coordinates = regionFile.getChunkCoordinates()
+
+        batches = []
+        for i in range(0, len(coordinates), self._chunkSize):
+            batch = coordinates[i:i + self._chunkSize]
+            batches.append((batch, self._executor.submit(_runChunks, region, batch, func)))
+
+        return ((x, z, result) for (x, z), result in self._collect(batches, ordered))
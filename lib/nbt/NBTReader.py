@@ -0,0 +1,299 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Iterator
+from typing import BinaryIO
+
+from lib.nbt import NBTTagType, NBTException, NBTEvent, NBTEventType, NBTNameTable
+from lib.nbt.NBTBinary import BYTE, SHORT, USHORT, INT, LONG, FLOAT, DOUBLE, unpackArray
+
+
+class NBTReader:
+    '''
+    Streams binary NBT as a sequence of NBTEvent without building any tag object.
+
+    The source can be a bytes-like object or a binary file object (e.g. gzip.GzipFile), which is read
+    in blocks of bufferSize bytes, so memory usage doesn't depend on the size of the document.
+    Stopping the iteration early leaves the rest of the source unread.
+    Names are decoded through nameTable, NBTNameTable.getDefault() if None.
+    '''
+
+    def __init__(self, source: bytes | bytearray | memoryview | BinaryIO, bufferSize: int = 65536, nameTable: NBTNameTable | None = None):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._stream = None
+            self._data = memoryview(source)
+        else:
+            self._stream = source
+            self._data = memoryview(b'')
+
+        self._bufferSize = bufferSize
+        self._nameTable = nameTable if nameTable is not None else NBTNameTable.getDefault()
+        self._position = 0
+        self._skipRequested = False
+
+    def _need(self, size: int) -> None:
+        if self._position + size <= len(self._data):
+            return
+
+        if self._stream is None:
+            raise NBTException("Unexpected end of NBT data.")
+
+        chunks = [bytes(self._data[self._position:])]
+        available = len(chunks[0])
+        while available < size:
+            chunk = self._stream.read(max(self._bufferSize, size - available))
+            if not chunk:
+                raise NBTException("Unexpected end of NBT data.")
+
+            chunks.append(chunk)
+            available += len(chunk)
+
+        self._data = memoryview(b''.join(chunks))
+        self._position = 0
+
+    def _readLength(self, position: int) -> int:
+        '''
+        Reads a declared element count, which must already be buffered, rejecting negative ones.
+        '''
+
+        length = INT.unpack_from(self._data, position)[0]
+        if length < 0:
+            raise NBTException(f"Invalid length: {length}.")
+
+        return length
+
+    def _readTagType(self, position: int) -> NBTTagType:
+        '''
+        Reads a tag id, which must already be buffered, rejecting unknown ones.
+        '''
+
+        tagId = self._data[position]
+        try:
+            return NBTTagType(tagId)
+        except ValueError:
+            raise NBTException(f"Invalid tag type: {tagId}")
+
+    def _readHeader(self) -> tuple[NBTTagType, str]:
+        self._need(1)
+        tagType = self._readTagType(self._position)
+        if tagType == NBTTagType.TAG_End:
+            self._position += 1
+            return tagType, ''
+
+        self._need(3)
+        nameLength = USHORT.unpack_from(self._data, self._position + 1)[0]
+        self._need(3 + nameLength)
+        name = self._nameTable.decode(self._data, self._position + 3, self._position + 3 + nameLength)
+        self._position += 3 + nameLength
+
+        return tagType, name
+
+    def _readValue(self, tagType: NBTTagType):
+        match tagType:
+            case NBTTagType.TAG_Byte:
+                self._need(1)
+                value = BYTE.unpack_from(self._data, self._position)[0]
+                self._position += 1
+
+            case NBTTagType.TAG_Short:
+                self._need(2)
+                value = SHORT.unpack_from(self._data, self._position)[0]
+                self._position += 2
+
+            case NBTTagType.TAG_Int:
+                self._need(4)
+                value = INT.unpack_from(self._data, self._position)[0]
+                self._position += 4
+
+            case NBTTagType.TAG_Long:
+                self._need(8)
+                value = LONG.unpack_from(self._data, self._position)[0]
+                self._position += 8
+
+            case NBTTagType.TAG_Float:
+                self._need(4)
+                value = FLOAT.unpack_from(self._data, self._position)[0]
+                self._position += 4
+
+            case NBTTagType.TAG_Double:
+                self._need(8)
+                value = DOUBLE.unpack_from(self._data, self._position)[0]
+                self._position += 8
+
+            case NBTTagType.TAG_String:
+                self._need(2)
+                length = USHORT.unpack_from(self._data, self._position)[0]
+                self._need(2 + length)
+                value = str(self._data[self._position + 2:self._position + 2 + length], 'utf-8')
+                self._position += 2 + length
+
+            case NBTTagType.TAG_Byte_Array | NBTTagType.TAG_Int_Array | NBTTagType.TAG_Long_Array:
+                typecode, size = {
+                    NBTTagType.TAG_Byte_Array: ('b', 1),
+                    NBTTagType.TAG_Int_Array: ('i', 4),
+                    NBTTagType.TAG_Long_Array: ('q', 8),
+                }[tagType]
+
+                self._need(4)
+                length = self._readLength(self._position)
+                self._need(4 + length * size)
+                value = unpackArray(typecode, self._data, self._position + 4, length)
+                self._position += 4 + length * size
+
+            case _:
+                raise NBTException(f"{tagType.name} is not a value tag.")
+
+        return value
+
+    def _advance(self, size: int) -> None:
+        if self._position + size <= len(self._data) or self._stream is None:
+            self._need(size)
+            self._position += size
+            return
+
+        # Discard the bytes straight from the stream instead of buffering them
+        size -= len(self._data) - self._position
+        self._data = memoryview(b'')
+        self._position = 0
+        while size > 0:
+            chunk = self._stream.read(min(self._bufferSize, size))
+            if not chunk:
+                raise NBTException("Unexpected end of NBT data.")
+
+            size -= len(chunk)
+
+    def _skipPayload(self, tagType: NBTTagType, count: int = 1) -> None:
+        # Each entry is [tagType, remaining payloads], or [None, 0] while inside a compound
+        pending: list[list] = [[tagType, count]]
+        while pending:
+            top = pending[-1]
+            tagType = top[0]
+
+            if tagType is None:
+                self._need(1)
+                tagType = self._readTagType(self._position)
+                if tagType == NBTTagType.TAG_End:
+                    self._position += 1
+                    pending.pop()
+                    continue
+
+                self._need(3)
+                self._advance(3 + USHORT.unpack_from(self._data, self._position + 1)[0])
+                pending.append([tagType, 1])
+                continue
+            elif top[1] == 0:
+                pending.pop()
+                continue
+
+            match tagType:
+                case NBTTagType.TAG_Compound:
+                    top[1] -= 1
+                    pending.append([None, 0])
+
+                case NBTTagType.TAG_List:
+                    top[1] -= 1
+                    self._need(5)
+                    subtag = self._readTagType(self._position)
+                    length = self._readLength(self._position + 1)
+                    self._position += 5
+                    pending.append([subtag, length])
+
+                case NBTTagType.TAG_String:
+                    for _ in range(top[1]):
+                        self._need(2)
+                        self._advance(2 + USHORT.unpack_from(self._data, self._position)[0])
+
+                    pending.pop()
+
+                case NBTTagType.TAG_Byte_Array | NBTTagType.TAG_Int_Array | NBTTagType.TAG_Long_Array:
+                    size = 1 if tagType == NBTTagType.TAG_Byte_Array else 4 if tagType == NBTTagType.TAG_Int_Array else 8
+                    for _ in range(top[1]):
+                        self._need(4)
+                        self._advance(4 + self._readLength(self._position) * size)
+
+                    pending.pop()
+
+                case _:
+                    self._advance(tagType.size() * top[1])
+                    pending.pop()
+
+    def skip(self) -> None:
+        '''
+        Skips the payload of the compound or list whose START event was just received.
+        The matching END event is still emitted.
+        '''
+
+        self._skipRequested = True
+
+    def __iter__(self) -> Iterator[NBTEvent]:
+        # Each entry is None for a compound, or [listType, remaining elements] for a list
+        stack: list[list | None] = []
+        names: list[str] = []
+
+        tagType, name = self._readHeader()
+        if tagType == NBTTagType.TAG_End:
+            return
+
+        while True:
+            if tagType == NBTTagType.TAG_Compound:
+                yield NBTEvent(NBTEventType.START_COMPOUND, tagType, name)
+
+                if self._skipRequested:
+                    self._skipRequested = False
+                    self._skipPayload(tagType)
+                    yield NBTEvent(NBTEventType.END, tagType, name)
+                else:
+                    stack.append(None)
+                    names.append(name)
+            elif tagType == NBTTagType.TAG_List:
+                self._need(5)
+                listType = self._readTagType(self._position)
+                length = self._readLength(self._position + 1)
+                self._position += 5
+
+                yield NBTEvent(NBTEventType.START_LIST, listType, name, length)
+
+                if self._skipRequested:
+                    self._skipRequested = False
+                    self._skipPayload(listType, length)
+
+                    yield NBTEvent(NBTEventType.END, tagType, name)
+                else:
+                    stack.append([listType, length])
+                    names.append(name)
+            else:
+                yield NBTEvent(NBTEventType.VALUE, tagType, name, self._readValue(tagType))
+
+            # Look for the next tag, closing every finished container on the way
+            while stack:
+                top = stack[-1]
+                if top is None:
+                    tagType, name = self._readHeader()
+                    if tagType != NBTTagType.TAG_End:
+                        break
+
+                    stack.pop()
+                    yield NBTEvent(NBTEventType.END, NBTTagType.TAG_Compound, names.pop())
+                elif top[1] > 0:
+                    top[1] -= 1
+                    tagType, name = top[0], ''
+                    break
+                else:
+                    stack.pop()
+                    yield NBTEvent(NBTEventType.END, NBTTagType.TAG_List, names.pop())
+            else:
+                return
@@ -0,0 +1,186 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import mmap
+from collections.abc import Iterator
+from os import PathLike, path
+from struct import Struct
+
+from lib.nbt import NBTTag, NBTException, NBTCompression, NBTParser
+from lib.nbt.NBTBinary import INT
+
+
+_HEADER = Struct('>1024L')
+
+SECTOR_SIZE = 4096
+
+
+class NBTRegion:
+    '''
+    Reads chunks from an Anvil region file (.mca).
+
+    The file is memory-mapped and only its two header sectors (chunk locations and timestamps) are read when it is
+    opened. Each chunk is decompressed and parsed on request, without reading the other chunks.
+
+    Chunk coordinates can be either relative to the region (0 to 31) or absolute, as only their lower 5 bits are used.
+    '''
+
+    def __init__(self, file: str | PathLike):
+        self._path = file
+        self._file = open(file, 'rb')
+
+        try:
+            size = path.getsize(file)
+            if size == 0:
+                # Freshly created regions may be empty, and an empty file can't be mapped
+                self._mmap = None
+                self._locations = [(0, 0)] * 1024
+                self._timestamps = [0] * 1024
+                return
+
+            if size < 2 * SECTOR_SIZE:
+                raise NBTException("Invalid region file: the header is truncated.")
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        self._locations = [(location >> 8, location & 0xff) for location in _HEADER.unpack_from(self._mmap, 0)]
+        self._timestamps = list(_HEADER.unpack_from(self._mmap, SECTOR_SIZE))
+
+    def __enter__(self) -> 'NBTRegion':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        self._file.close()
+
+    def getPath(self) -> str | PathLike:
+        return self._path
+
+    @staticmethod
+    def _index(x: int, z: int) -> int:
+        return (x & 31) + (z & 31) * 32
+
+    def hasChunk(self, x: int, z: int) -> bool:
+        return self._locations[NBTRegion._index(x, z)][0] != 0
+
+    def getTimestamp(self, x: int, z: int) -> int:
+        '''
+        @return int When the chunk was last saved, in seconds since the epoch
+        '''
+
+        return self._timestamps[NBTRegion._index(x, z)]
+
+    def getChunkLocation(self, x: int, z: int) -> tuple[int, int]:
+        '''
+        @return tuple[int, int] The byte offset of the chunk in the file and the number of bytes it spans, or (0, 0) if the chunk is not present
+        '''
+
+        offset, sectors = self._locations[NBTRegion._index(x, z)]
+
+        return offset * SECTOR_SIZE, sectors * SECTOR_SIZE
+
+    def getChunkCoordinates(self) -> list[tuple[int, int]]:
+        '''
+        @return list[tuple[int, int]] The relative coordinates of the chunks present in the region, in file header order
+        '''
+
+        return [(index & 31, index >> 5) for index, (offset, _) in enumerate(self._locations) if offset != 0]
+
+    def getChunkData(self, x: int, z: int) -> bytes | None:
+        '''
+        Decompresses a single chunk.
+
+        @param int x
+        @param int z
+
+        @return bytes|None The uncompressed NBT of the chunk, or None if the chunk is not present
+        '''
+
+        offset, sectors = self._locations[NBTRegion._index(x, z)]
+        if offset == 0:
+            return None
+
+        start = offset * SECTOR_SIZE
+        if self._mmap is None or start + 5 > len(self._mmap):
+            raise NBTException(f"Invalid region file: chunk ({x & 31}, {z & 31}) is out of bounds.")
+
+        length = INT.unpack_from(self._mmap, start)[0]
+        compressionType = self._mmap[start + 4]
+        if length < 1 or start + 4 + length > len(self._mmap):
+            raise NBTException(f"Invalid region file: chunk ({x & 31}, {z & 31}) is out of bounds.")
+
+        try:
+            compression = NBTCompression(compressionType & 0x7f)
+        except ValueError:
+            raise NBTException(f"Unsupported compression type {compressionType & 0x7f} in chunk ({x & 31}, {z & 31}).")
+
+        # Oversized chunks are stored in a c.<x>.<z>.mcc file next to the region, with absolute coordinates
+        if compressionType & 0x80:
+            regionX, regionZ = self._regionCoordinates()
+            external = path.join(path.dirname(self._path), f"c.{regionX * 32 + (x & 31)}.{regionZ * 32 + (z & 31)}.mcc")
+            with open(external, 'rb') as file:
+                return bytes(compression.decompress(file.read()))
+
+        with memoryview(self._mmap) as view:
+            data = view[start + 5:start + 4 + length]
+            try:
+                return bytes(compression.decompress(data))
+            finally:
+                data.release()
+
+    def _regionCoordinates(self) -> tuple[int, int]:
+        parts = path.basename(self._path).split('.')
+        if len(parts) != 4 or parts[0] != 'r':
+            raise NBTException(f"Can't tell the region coordinates from the file name '{path.basename(self._path)}'.")
+
+        return int(parts[1]), int(parts[2])
+
+    def getChunk(self, x: int, z: int) -> NBTTag | None:
+        '''
+        Decompresses and parses a single chunk.
+
+        @param int x
+        @param int z
+
+        @return NBTTag|None The chunk, or None if it is not present
+        '''
+
+        data = self.getChunkData(x, z)
+        if data is None:
+            return None
+
+        return NBTParser.parse(data)
+
+    def __len__(self) -> int:
+        return sum(1 for offset, _ in self._locations if offset != 0)
+
+    def __iter__(self) -> Iterator[tuple[int, int, NBTTag]]:
+        '''
+        Parses the chunks one at a time, yielding their relative coordinates and their tag.
+        '''
+
+        for x, z in self.getChunkCoordinates():
+            yield x, z, self.getChunk(x, z)
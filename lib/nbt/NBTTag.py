@@ -22,6 +22,8 @@ from lib.nbt import NBTTagType
 
 
 class NBTTag:
+    __slots__ = ()
+
     _type: NBTTagType
 
     def getType(self) -> NBTTagType:
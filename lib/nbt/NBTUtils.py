@@ -17,7 +17,7 @@
 
 import re
 
-from lib.nbt import NBTNamedTag
+from lib.nbt import NBTNamedTag, NBTParser, NBTException
 from lib.nbt.tag import NBTTagByteArray, NBTTagCompound, NBTTagIntArray, NBTTagList, NBTTagLongArray
 from lib.settings import settings
 
@@ -54,6 +54,18 @@ class NBTUtils:
 
         return current
 
+    @staticmethod
+    def getWalkingBinary(data: bytes | bytearray | memoryview, key: list[str]) -> NBTNamedTag:
+        '''
+        Same as getWalking, but reads straight from a binary NBT, decoding only the requested tag.
+        '''
+
+        tag = NBTParser.parsePaths(data, [key])[0]
+        if tag is None:
+            raise NBTException(f"Tag not found: {'.'.join(key)}")
+
+        return tag
+
     @staticmethod
     def setWalking(
         tag: NBTTagCompound | NBTTagList | NBTTagByteArray | NBTTagIntArray | NBTTagLongArray,
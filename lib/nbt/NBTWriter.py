@@ -0,0 +1,230 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from array import array
+from collections.abc import Iterable
+from struct import Struct, error as StructError
+import sys
+from typing import BinaryIO
+
+from lib.nbt import NBTTagType, NBTException, NBTNamedTag
+from lib.nbt.NBTBinary import BYTE, SHORT, USHORT, INT, LONG, FLOAT, DOUBLE, HEADER
+
+
+_LIST_HEADER = Struct('>Bl')
+
+
+class NBTWriter:
+    '''
+    Writes binary NBT to a stream one tag at a time, without building the tree in memory.
+
+    Tags are written in document order: begin a compound or a list, write its children and end it.
+    Inside a compound every tag needs a name, inside a list the names are ignored and every element must have the list
+    type. Nesting is validated as the tags are written, and the output is byte-identical to toBinary() of the same tree.
+
+    Output is buffered in blocks of bufferSize bytes, so memory usage doesn't depend on the size of the document.
+    '''
+
+    def __init__(self, stream: BinaryIO, bufferSize: int = 65536):
+        self._stream = stream
+        self._bufferSize = bufferSize
+        self._buffer = bytearray()
+        # Each entry is an open container: [list type (None for compounds), remaining elements]
+        self._stack: list[list] = []
+        self._rootWritten = False
+
+    def __enter__(self) -> 'NBTWriter':
+        return self
+
+    def __exit__(self, exceptionType, *args) -> None:
+        if exceptionType is None:
+            self.close()
+        else:
+            self.flush()
+
+    def _write(self, data: bytes | bytearray | memoryview) -> None:
+        if len(self._buffer) + len(data) > self._bufferSize:
+            self.flush()
+
+            if len(data) > self._bufferSize:
+                self._stream.write(data)
+                return
+
+        self._buffer += data
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._stream.write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self) -> None:
+        '''
+        Flushes the buffered output, checking that the document is complete. The stream is not closed.
+        '''
+
+        if self._stack:
+            raise NBTException(f"{len(self._stack)} container(s) were not ended.")
+        elif not self._rootWritten:
+            raise NBTException("No tag was written.")
+
+        self.flush()
+
+    def _header(self, tagType: NBTTagType, name: str) -> None:
+        '''
+        Validates the position of a tag and writes its header. Payloads must be ready beforehand, so that a value which
+        can't be written leaves the writer unchanged.
+        '''
+
+        if not self._stack or self._stack[-1][0] is None:
+            nameEncoded = (name or '').encode('utf-8')
+            if len(nameEncoded) > 0xffff:
+                raise NBTException(f"The name is too long: {len(nameEncoded)} bytes.")
+
+        if not self._stack:
+            if self._rootWritten:
+                raise NBTException("The root tag was already written.")
+
+            self._rootWritten = True
+        elif self._stack[-1][0] is not None:
+            frame = self._stack[-1]
+            if frame[0] != tagType:
+                raise TypeError('The list type is ' + frame[0].name + ' but the value type is ' + tagType.name)
+            elif frame[1] == 0:
+                raise NBTException("The list already has all of its declared elements.")
+
+            frame[1] -= 1
+            return
+
+        self._write(HEADER.pack(tagType.value, len(nameEncoded)))
+        self._write(nameEncoded)
+
+    def beginCompound(self, name: str = '') -> None:
+        self._header(NBTTagType.TAG_Compound, name)
+        self._stack.append([None, 0])
+
+    def beginList(self, name: str, listType: NBTTagType, count: int) -> None:
+        '''
+        @param str name
+        @param NBTTagType listType Type of the elements
+        @param int count Number of elements that will be written before end()
+        '''
+
+        if count < 0:
+            raise NBTException("The list length can't be negative.")
+        elif count > 0 and listType == NBTTagType.TAG_End:
+            raise NBTException("A list of TAG_End can't have elements.")
+
+        try:
+            listHeader = _LIST_HEADER.pack(listType.value, count)
+        except StructError:
+            raise NBTException(f"The list is too long: {count} elements.")
+
+        self._header(NBTTagType.TAG_List, name)
+        self._write(listHeader)
+        self._stack.append([listType, count])
+
+    def end(self) -> None:
+        '''
+        Ends the innermost open compound or list.
+        '''
+
+        if not self._stack:
+            raise NBTException("There is no open compound or list to end.")
+
+        listType, remaining = self._stack.pop()
+        if listType is None:
+            self._write(b'\x00')
+        elif remaining > 0:
+            raise NBTException(f"The list is missing {remaining} of its declared elements.")
+
+    def _writeValue(self, tagType: NBTTagType, name: str, struct: Struct, value: int | float) -> None:
+        try:
+            payload = struct.pack(value)
+        except StructError as e:
+            raise NBTException(f"Invalid {tagType.name} value {value!r}: {e}")
+
+        self._header(tagType, name)
+        self._write(payload)
+
+    def writeByte(self, name: str, value: int) -> None:
+        self._writeValue(NBTTagType.TAG_Byte, name, BYTE, value)
+
+    def writeShort(self, name: str, value: int) -> None:
+        self._writeValue(NBTTagType.TAG_Short, name, SHORT, value)
+
+    def writeInt(self, name: str, value: int) -> None:
+        self._writeValue(NBTTagType.TAG_Int, name, INT, value)
+
+    def writeLong(self, name: str, value: int) -> None:
+        self._writeValue(NBTTagType.TAG_Long, name, LONG, value)
+
+    def writeFloat(self, name: str, value: float) -> None:
+        self._writeValue(NBTTagType.TAG_Float, name, FLOAT, value)
+
+    def writeDouble(self, name: str, value: float) -> None:
+        self._writeValue(NBTTagType.TAG_Double, name, DOUBLE, value)
+
+    def writeString(self, name: str, value: str) -> None:
+        encoded = value.encode('utf-8')
+        if len(encoded) > 0xffff:
+            raise NBTException(f"The string is too long: {len(encoded)} bytes.")
+
+        self._header(NBTTagType.TAG_String, name)
+        self._write(USHORT.pack(len(encoded)))
+        self._write(encoded)
+
+    def _writeArray(self, tagType: NBTTagType, name: str, typecode: str, values: array | Iterable[int]) -> None:
+        try:
+            if not isinstance(values, array) or values.typecode != typecode:
+                values = array(typecode, values)
+        except OverflowError as e:
+            raise NBTException(f"Invalid {tagType.name} value: {e}")
+
+        if values.itemsize > 1 and sys.byteorder == 'little':
+            values = array(typecode, values)
+            values.byteswap()
+
+        self._header(tagType, name)
+        self._write(INT.pack(len(values)))
+
+        with memoryview(values) as view, view.cast('B') as data:
+            self._write(data)
+
+    def writeByteArray(self, name: str, values: array | Iterable[int]) -> None:
+        self._writeArray(NBTTagType.TAG_Byte_Array, name, 'b', values)
+
+    def writeIntArray(self, name: str, values: array | Iterable[int]) -> None:
+        self._writeArray(NBTTagType.TAG_Int_Array, name, 'i', values)
+
+    def writeLongArray(self, name: str, values: array | Iterable[int]) -> None:
+        self._writeArray(NBTTagType.TAG_Long_Array, name, 'q', values)
+
+    def writeTag(self, tag: NBTNamedTag, name: str | None = None) -> None:
+        '''
+        Writes an already built tag.
+
+        @param NBTNamedTag tag
+        @param str|None name Defaults to the name of the tag
+        '''
+
+        try:
+            payload = tag.payloadAsBinary()
+        except StructError as e:
+            raise NBTException(f"Invalid {tag.getType().name} value: {e}")
+
+        self._header(tag.getType(), tag.getName() if name is None else name)
+        self._write(payload)
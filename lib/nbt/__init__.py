@@ -14,9 +14,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .NBTTag import NBTTag
+from .NBTException import NBTException
 from .NBTTagType import NBTTagType
+from .NBTTag import NBTTag
 from .NBTNamedTag import NBTNamedTag
-from .NBTUtils import NBTUtils
+from .NBTNameTable import NBTNameTable
+from .NBTEventType import NBTEventType
+from .NBTEvent import NBTEvent
+from .NBTReader import NBTReader
+from .NBTCompression import NBTCompression
 from .NBTParser import NBTParser
-from .NBTException import NBTException
+from .NBTWriter import NBTWriter
+from .NBTUtils import NBTUtils
+from .NBTRegion import NBTRegion
+from .NBTPool import NBTPool
+from .NBTPatcher import NBTPatcher
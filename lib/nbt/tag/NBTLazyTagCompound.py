@@ -0,0 +1,156 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from argparse import ArgumentError
+from collections.abc import Iterable
+
+from lib.nbt import NBTNamedTag, NBTTagType, NBTException
+from lib.nbt.tag import NBTTagCompound
+
+
+class NBTLazyTagCompound(NBTTagCompound):
+    '''
+    A compound returned by NBTParser.parseLazy.
+
+    Only the position of each child is known until it is accessed through get or iteration.
+    Children that were never decoded are serialized by copying their original bytes.
+    '''
+
+    __slots__ = ('_data', '_start', '_end', '_children', '_decoded')
+
+    def __init__(self, name: str, data: memoryview, start: int, end: int, children: dict[str, tuple[NBTTagType, int, int, int]]):
+        super().__init__(name, [])
+        self._data = data
+        self._start = start
+        self._end = end
+        # name -> (type, offset of the tag, offset of the payload, end of the tag), None once materialized
+        self._children: dict[str, tuple[NBTTagType, int, int, int]] | None = children
+        self._decoded: dict[str, NBTNamedTag] = {}
+        self._payloadSize = end - start
+
+    def _decode(self, name: str) -> NBTNamedTag:
+        from lib.nbt import NBTParser
+
+        tag = self._decoded.get(name)
+        if tag is None:
+            tagType, _, payloadOffset, end = self._children[name]
+            tag = NBTParser.parseLazyTagAt(tagType, name, self._data, payloadOffset)[0]
+            tag._parent = self
+            self._decoded[name] = tag
+
+            # A compound with a repeated name below is shorter than the bytes it was read from
+            if tag.getPayloadSize() != end - payloadOffset:
+                self.invalidate()
+
+        return tag
+
+    def _materialize(self) -> None:
+        if self._children is None:
+            return
+
+        self._payload = self._indexChildren([self._decode(name) for name in self._children])
+        self._children = None
+        self._decoded = {}
+
+    def getPayload(self) -> list[NBTNamedTag]:
+        self._materialize()
+        return super().getPayload()
+
+    def setPayload(self, payload: Iterable[NBTNamedTag]):
+        for tag in self._decoded.values():
+            if tag._parent is self:
+                tag._parent = None
+
+        self._children = None
+        self._decoded = {}
+        super().setPayload(payload)
+
+    def payloadAsBinary(self) -> bytes:
+        if self._children is not None and not self._decoded:
+            return bytes(self._data[self._start:self._end])
+
+        return super().payloadAsBinary()
+
+    def _binaryParts(self) -> tuple[bytes, list[NBTNamedTag | memoryview], bool, bytes] | None:
+        if self._children is None:
+            return super()._binaryParts()
+        elif not self._decoded:
+            return None
+
+        return b'', [self._decoded[name] if name in self._decoded else self._data[start:end] for name, (_, start, _, end) in self._children.items()], True, b'\x00'
+
+    def _computePayloadSize(self) -> int:
+        if self._children is None:
+            return super()._computePayloadSize()
+
+        return sum([self._decoded[name].getByteLength() if name in self._decoded else end - start for name, (_, start, _, end) in self._children.items()]) + 1
+
+    def keys(self) -> list[dict[str, str]]:
+        if self._children is None:
+            return super().keys()
+
+        return [{"name": name, "type": tagType.name} for name, (tagType, _, _, _) in self._children.items()]
+
+    def get(self, name: str) -> NBTNamedTag:
+        if self._children is None:
+            return super().get(name)
+        elif not name:
+            raise ArgumentError(None, message="Invalid key.")
+        elif name not in self._children:
+            raise NBTException(f"Tag not found: {name}")
+
+        return self._decode(name)
+
+    def has(self, name: str) -> bool:
+        if self._children is None:
+            return super().has(name)
+        elif not name:
+            raise ArgumentError(None, message="Invalid key.")
+
+        return name in self._children
+
+    def _removeChild(self, tag: NBTNamedTag) -> None:
+        self._materialize()
+        super()._removeChild(tag)
+
+    def _renameChild(self, tag: NBTNamedTag, name: str) -> None:
+        self._materialize()
+        super()._renameChild(tag, name)
+
+    def set(self, name: str, value: NBTNamedTag):
+        self._materialize()
+        super().set(name, value)
+
+    def add(self, value: NBTNamedTag):
+        self._materialize()
+        super().add(value)
+
+    def remove(self, name: str):
+        self._materialize()
+        super().remove(name)
+
+    def __len__(self) -> int:
+        if self._children is None:
+            return super().__len__()
+
+        return len(self._children)
+
+    def __iter__(self):
+        if self._children is None:
+            return super().__iter__()
+
+        return (self._decode(name) for name in list(self._children))
@@ -0,0 +1,139 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from struct import pack
+
+from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.tag import NBTTagList
+
+
+class NBTLazyTagList(NBTTagList):
+    '''
+    A list of compounds, lists, strings or arrays returned by NBTParser.parseLazy.
+
+    Only the position of each element is known until it is accessed through get or iteration.
+    Elements that were never decoded are serialized by copying their original bytes.
+    '''
+
+    __slots__ = ('_data', '_start', '_end', '_offsets', '_decoded')
+
+    def __init__(self, name: str, data: memoryview, start: int, end: int, listType: NBTTagType, offsets: list[int]):
+        super().__init__(name, [], listType)
+        self._data = data
+        self._start = start
+        self._end = end
+        # Offset of the payload of each element, None once materialized
+        self._offsets: list[int] | None = offsets
+        self._decoded: dict[int, NBTNamedTag] = {}
+        self._payloadSize = end - start
+
+    def _decode(self, index: int) -> NBTNamedTag:
+        from lib.nbt import NBTParser
+
+        tag = self._decoded.get(index)
+        if tag is None:
+            tag = NBTParser.parseLazyTagAt(self.getListType(), '', self._data, self._offsets[index])[0]
+            tag._parent = self
+            self._decoded[index] = tag
+
+            # A compound with a repeated name below is shorter than the bytes it was read from
+            if tag.getPayloadSize() != self._elementEnd(index) - self._offsets[index]:
+                self.invalidate()
+
+        return tag
+
+    def _elementEnd(self, index: int) -> int:
+        return self._offsets[index + 1] if index + 1 < len(self._offsets) else self._end
+
+    def _materialize(self) -> None:
+        if self._offsets is None:
+            return
+
+        self._payload = [self._decode(index) for index in range(len(self._offsets))]
+        self._offsets = None
+        self._decoded = {}
+
+    def getPayload(self) -> list[NBTNamedTag]:
+        self._materialize()
+        return super().getPayload()
+
+    def setPayload(self, payload: list[NBTNamedTag]):
+        for tag in self._decoded.values():
+            if tag._parent is self:
+                tag._parent = None
+
+        self._offsets = None
+        self._decoded = {}
+        super().setPayload(payload)
+
+    def payloadAsBinary(self) -> bytes:
+        if self._offsets is not None and not self._decoded:
+            return bytes(self._data[self._start:self._end])
+
+        return super().payloadAsBinary()
+
+    def _binaryParts(self) -> tuple[bytes, list[NBTNamedTag | memoryview], bool, bytes] | None:
+        if self._offsets is None:
+            return super()._binaryParts()
+        elif not self._decoded:
+            return None
+
+        return pack('>Bl', self.getListType().value, len(self._offsets)), [self._decoded[index] if index in self._decoded else self._data[offset:self._elementEnd(index)] for index, offset in enumerate(self._offsets)], False, b''
+
+    def _computePayloadSize(self) -> int:
+        if self._offsets is None:
+            return super()._computePayloadSize()
+
+        return 1 + 4 + sum([self._decoded[index].getPayloadSize() if index in self._decoded else self._elementEnd(index) - offset for index, offset in enumerate(self._offsets)])
+
+    def get(self, index: int) -> NBTNamedTag:
+        if self._offsets is None:
+            return super().get(index)
+        elif (index < 0 or index >= len(self._offsets)):
+            raise IndexError(f'Index out of bounds: {index}')
+
+        return self._decode(index)
+
+    def set(self, index: int, value: NBTNamedTag) -> None:
+        self._materialize()
+        super().set(index, value)
+
+    def add(self, value: NBTNamedTag) -> None:
+        self._materialize()
+        super().add(value)
+
+    def remove(self, index: int) -> None:
+        self._materialize()
+        super().remove(index)
+
+    def __len__(self) -> int:
+        if self._offsets is None:
+            return super().__len__()
+
+        return len(self._offsets)
+
+    def __iter__(self):
+        if self._offsets is None:
+            return super().__iter__()
+
+        return (self._decode(index) for index in range(len(self._offsets)))
+
+    def __reversed__(self):
+        if self._offsets is None:
+            return super().__reversed__()
+
+        return (self._decode(index) for index in reversed(range(len(self._offsets))))
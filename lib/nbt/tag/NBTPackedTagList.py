@@ -0,0 +1,170 @@
+# A Python 3 NBT (Named Binary Tag) Parser
+#
+# Copyright 2022 Dhiego Cassiano Fogaça Barbosa <modscleo4@outlook.com>
+#
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from array import array
+from collections.abc import Iterable
+
+from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import UBYTE, INT, packArrayInto
+from lib.nbt.tag import NBTTagByte, NBTTagDouble, NBTTagFloat, NBTTagInt, NBTTagList, NBTTagLong, NBTTagShort
+
+
+class NBTPackedTagList(NBTTagList):
+    '''
+    A list of bytes, shorts, ints, longs, floats or doubles, created by NBTTagList for those list types.
+
+    The values are stored in a packed array.array, element tags are only created when accessed, so changing
+    an element returned by get doesn't change the list. Floats are kept as doubles, so that their values are
+    exactly the ones that were set, and are only narrowed when written as binary.
+    '''
+
+    __slots__ = ('_offset',)
+
+    _snbtBrackets: None = None
+
+    def __init__(self, name: str, payload: Iterable[NBTNamedTag | int | float] = [], listType: NBTTagType = NBTTagType.TAG_End, additionalMetadata: dict = {}):
+        NBTNamedTag.__init__(self, name, None, additionalMetadata)
+        self._listType = listType
+        self._payloadSize = None
+        self._raw = None
+        self._payload = self._toArray(payload)
+
+    def _elementClass(self) -> type[NBTNamedTag]:
+        return _ELEMENT_TYPES[self._listType]
+
+    def _toArray(self, payload: Iterable[NBTNamedTag | int | float]) -> array:
+        typecode = _TYPECODES[self._listType]
+        if isinstance(payload, array) and payload.typecode == typecode:
+            return payload
+
+        return array(typecode, [self._toValue(value) for value in payload])
+
+    def _toValue(self, value: NBTNamedTag | int | float) -> int | float:
+        if not isinstance(value, NBTNamedTag):
+            return value
+        elif value.getType() != self._listType:
+            raise TypeError('The list type is ' + self._listType.name + ' but the value type is ' + value.getType().name)
+
+        return value.getPayload()
+
+    def setPayload(self, payload: Iterable[NBTNamedTag | int | float]):
+        NBTNamedTag.setPayload(self, self._toArray(payload))
+
+    def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
+        payload = self.getPayload()
+        suffix = _SUFFIXES[self._listType]
+        separator = suffix + (",\n" + ''.rjust(iteration * 2, ' ') if format else ',')
+        content = separator.join(map(str, payload)) + (suffix if payload else '')
+
+        if not format:
+            return '[' + content + ']'
+
+        return "[\n" + ''.rjust(iteration * 2, ' ') + content + "\n" + ''.rjust((iteration - 1) * 2, ' ') + "]"
+
+    def payloadAsBinary(self) -> bytes:
+        buffer = bytearray(self.getPayloadSize())
+        with memoryview(buffer) as view:
+            self._writePayload(view, 0)
+
+        return bytes(buffer)
+
+    def _binaryParts(self) -> None:
+        return None
+
+    def _writePayload(self, buffer: memoryview, offset: int) -> int:
+        payload = self.getPayload()
+        if self._listType == NBTTagType.TAG_Float:
+            payload = array('f', payload)
+
+        UBYTE.pack_into(buffer, offset, self._listType.value)
+        INT.pack_into(buffer, offset + 1, len(payload))
+
+        return packArrayInto(payload, buffer, offset + 5)
+
+    def _computePayloadSize(self) -> int:
+        return 1 + 4 + len(self.getPayload()) * self._listType.size()
+
+    def get(self, index: int) -> NBTNamedTag:
+        payload = self.getPayload()
+        if (index < 0 or index >= len(payload)):
+            raise IndexError(f'Index out of bounds: {index}')
+
+        return self._elementClass()('', payload[index])
+
+    def set(self, index: int, value: NBTNamedTag | int | float) -> None:
+        payload = self.getPayload()
+        if (index < 0 or index >= len(payload)):
+            raise IndexError(f'Index out of bounds: {index}')
+
+        payload[index] = self._toValue(value)
+        self.invalidate()
+
+    def add(self, value: NBTNamedTag | int | float) -> None:
+        payload = self.getPayload()
+        payload.append(self._toValue(value))
+        self.invalidate()
+
+    def remove(self, index: int) -> None:
+        payload = self.getPayload()
+        if (index < 0 or index >= len(payload)):
+            raise IndexError(f'Index out of bounds: {index}')
+
+        payload.pop(index)
+        self.invalidate()
+
+    def __iter__(self):
+        elementType = self._elementClass()
+        return (elementType('', value) for value in self.getPayload())
+
+    def __reversed__(self):
+        elementType = self._elementClass()
+        return (elementType('', value) for value in reversed(self.getPayload()))
+
+    def __contains__(self, value: NBTNamedTag | int | float) -> bool:
+        try:
+            return self._toValue(value) in self.getPayload()
+        except TypeError:
+            return False
+
+
+# Array typecode by list type. Floats are kept as doubles, see the class docstring
+_TYPECODES = {
+    NBTTagType.TAG_Byte: 'b',
+    NBTTagType.TAG_Short: 'h',
+    NBTTagType.TAG_Int: 'i',
+    NBTTagType.TAG_Long: 'q',
+    NBTTagType.TAG_Float: 'd',
+    NBTTagType.TAG_Double: 'd',
+}
+
+_ELEMENT_TYPES = {
+    NBTTagType.TAG_Byte: NBTTagByte,
+    NBTTagType.TAG_Short: NBTTagShort,
+    NBTTagType.TAG_Int: NBTTagInt,
+    NBTTagType.TAG_Long: NBTTagLong,
+    NBTTagType.TAG_Float: NBTTagFloat,
+    NBTTagType.TAG_Double: NBTTagDouble,
+}
+
+_SUFFIXES = {
+    NBTTagType.TAG_Byte: 'b',
+    NBTTagType.TAG_Short: 's',
+    NBTTagType.TAG_Int: '',
+    NBTTagType.TAG_Long: 'l',
+    NBTTagType.TAG_Float: 'f',
+    NBTTagType.TAG_Double: 'd',
+}
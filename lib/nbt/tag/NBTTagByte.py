@@ -15,16 +15,20 @@
 # limitations under the License.
 
 
-from struct import pack
+from struct import Struct
 
 from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import BYTE
 
 
 class NBTTagByte(NBTNamedTag[int]):
+    __slots__ = ('_offset',)
+
     _type: NBTTagType = NBTTagType.TAG_Byte
+    _struct: Struct = BYTE
 
     def toSNBT(self, format=True, iteration=1):
         return f"{self.getPayload()}b"
 
     def payloadAsBinary(self) -> bytes:
-        return pack('>b', self.getPayload())
+        return self._struct.pack(self.getPayload())
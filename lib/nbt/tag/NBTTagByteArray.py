@@ -20,5 +20,10 @@ from lib.nbt.tag import NBTTypedArray, NBTTagByte
 
 
 class NBTTagByteArray(NBTTypedArray[NBTTagByte]):
+    __slots__ = ()
+
     _type: NBTTagType = NBTTagType.TAG_Byte_Array
     _prefix: str = 'B'
+    _suffix: str = 'b'
+    _typecode: str = 'b'
+    _elementType: type[NBTTagByte] = NBTTagByte
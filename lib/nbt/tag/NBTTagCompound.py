@@ -16,106 +16,194 @@
 
 
 from argparse import ArgumentError
-import re
+from collections.abc import Iterable
 
 from lib.nbt import NBTNamedTag, NBTTagType, NBTException
 from lib.nbt.tag import NBTTagEnd
 
 
-class NBTTagCompound(NBTNamedTag[list[NBTNamedTag]]):
+class NBTTagCompound(NBTNamedTag[tuple[NBTNamedTag, ...] | dict[str, NBTNamedTag]]):
+    '''
+    Children are kept in insertion order: in a tuple, which takes the least memory and is scanned on lookup, while there
+    are at most _indexThreshold of them, and in a dict indexed by name above that, so that large compounds aren't
+    scanned.
+    A child with the same name as an earlier one replaces it. Adding a tag that is in another container moves it here.
+    '''
+
+    __slots__ = ('_payloadSize', '_raw')
+
     _type: NBTTagType = NBTTagType.TAG_Compound
+    _snbtBrackets: str = '{}'
+    _namedChildren: bool = True
 
-    def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
-        payload = self.getPayload()
-        content = [f'"{tag.getName()}"' if re.search(r'[ :]', tag.getName()) else tag.getName() + ':' + (' ' if format else '') + tag.toSNBT(format, iteration + 1) for tag in payload]
+    _indexThreshold: int = 8
+    '''
+    Number of children up to which they are kept in a tuple
+    '''
+
+    def __init__(self, name: str = '', payload: Iterable[NBTNamedTag] = [], additionalMetadata: dict = {}):
+        super().__init__(name, self._indexChildren(payload), additionalMetadata)
+        self._payloadSize: int | None = None
+        self._raw: memoryview | None = None
+
+    def _indexChildren(self, payload: Iterable[NBTNamedTag]) -> tuple[NBTNamedTag, ...] | dict[str, NBTNamedTag]:
+        '''
+        Adopts the children, keeping the last one of each name at the position of the first.
+        '''
+
+        children = tuple(payload)
+        if len(children) > self._indexThreshold or len({tag.getName() for tag in children}) != len(children):
+            index: dict[str, NBTNamedTag] = {}
+            for tag in children:
+                index[tag.getName()] = tag
+
+            children = index if len(index) > self._indexThreshold else tuple(index.values())
+
+        for tag in (children.values() if isinstance(children, dict) else children):
+            self._adopt(tag)
 
-        if not format:
-            return '{' + ','.join(content) + '}'
+        return children
 
-        return "{\n" + ''.rjust(iteration * 2, ' ') + (",\n" + ''.rjust(iteration * 2, ' ')).join(content) + "\n" + ''.rjust((iteration - 1) * 2, ' ') + "}"
+    def _tags(self) -> Iterable[NBTNamedTag]:
+        payload = self._payload
+        return payload.values() if isinstance(payload, dict) else payload
+
+    def _lookup(self, name: str) -> NBTNamedTag | None:
+        payload = self._payload
+        if isinstance(payload, dict):
+            return payload.get(name)
+
+        for tag in payload:
+            if tag._name == name:
+                return tag
+
+        return None
+
+    def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
+        return self._encodeSNBT(format, iteration)
 
     def payloadAsBinary(self) -> bytes:
-        payload = self.getPayload()
-        return b''.join([tag.toBinary() for tag in payload]) + NBTTagEnd().toBinary()
+        return self._encodeBinary(False)
+
+    def _binaryParts(self) -> tuple[bytes, Iterable[NBTNamedTag], bool, bytes]:
+        return b'', self._tags(), True, NBTTagEnd().toBinary()
+
+    def getPayload(self) -> list[NBTNamedTag]:
+        '''
+        @return list[NBTNamedTag] The children in order. Changing the list doesn't change the compound
+        '''
 
-    def getPayloadSize(self) -> int:
-        payload = self.getPayload()
-        return sum([tag.getByteLength() for tag in payload]) + NBTTagEnd().getByteLength()
+        return list(self._tags())
+
+    def setPayload(self, payload: Iterable[NBTNamedTag]):
+        for tag in self._tags():
+            if tag._parent is self:
+                tag._parent = None
+
+        super().setPayload(self._indexChildren(payload))
+
+    def _removeChild(self, tag: NBTNamedTag) -> None:
+        if self._lookup(tag.getName()) is tag:
+            self.remove(tag.getName())
+
+    def _renameChild(self, tag: NBTNamedTag, name: str) -> None:
+        if self._lookup(tag.getName()) is not tag or tag.getName() == name:
+            return
+        elif self._lookup(name) is not None:
+            raise NBTException(f"Tag already exists: {name}")
+
+        # Rebuild the index so that the child keeps its position
+        if isinstance(self._payload, dict):
+            self._payload = {(name if child is tag else key): child for key, child in self._payload.items()}
+
+    def _computePayloadSize(self) -> int:
+        return sum([tag.getByteLength() for tag in self._tags()]) + NBTTagEnd().getByteLength()
 
     def keys(self) -> list[dict[str, str]]:
-        payload = self.getPayload()
-        return [{"name": tag.getName(), "type": tag.getType().name} for tag in payload]
+        return [{"name": tag.getName(), "type": tag.getType().name} for tag in self._tags()]
 
     def get(self, name: str) -> NBTNamedTag:
         if not name:
             raise ArgumentError(None, message="Invalid key.")
 
-        payload = self.getPayload()
-
-        if name in payload:
-            tag = payload[name]
-
-            return tag
+        tag = self._lookup(name)
+        if tag is None:
+            raise NBTException(f"Tag not found: {name}")
 
-        raise NBTException(f"Tag not found: {name}")
+        return tag
 
     def set(self, name: str, value: NBTNamedTag):
+        '''
+        Replaces the child with the given name, keeping its position. The value takes the name of the key.
+        '''
+
         if not name:
             raise ArgumentError(None, message="Invalid key.")
         elif value is None:
             raise ArgumentError(None, message="Invalid value.")
 
-        payload = self.getPayload()
+        tag = self._lookup(name)
+        if tag is None:
+            raise NBTException(f"Tag not found: {name}")
+
+        if tag._parent is self:
+            tag._parent = None
 
-        for i in range(len(payload)):
-            if payload[i].getName() == name:
-                # Tag found, update its value
-                payload[i] = value
-                return
+        self._adopt(value)
+        value._name = name
+        if isinstance(self._payload, dict):
+            self._payload[name] = value
+        else:
+            self._payload = tuple([value if child is tag else child for child in self._payload])
 
-        raise NBTException(f"Tag not found: {name}")
+        self.invalidate()
 
     def has(self, name: str) -> bool:
         if not name:
             raise ArgumentError(None, message="Invalid key.")
 
-        payload = self.getPayload()
-        for tag in payload:
-            if tag.getName() == name:
-                return True
-
-        return False
+        return self._lookup(name) is not None
 
     def add(self, value: NBTNamedTag):
         if value is None:
             raise ArgumentError(None, message="Invalid value.")
 
-        payload = self.getPayload()
-
-        if value.getName() in payload:
+        if self._lookup(value.getName()) is not None:
             raise NBTException(f"Tag already exists: {value.getName()}")
 
-        payload.append(value)
+        self._adopt(value)
+        if isinstance(self._payload, dict):
+            self._payload[value.getName()] = value
+        elif len(self._payload) < self._indexThreshold:
+            self._payload += (value,)
+        else:
+            self._payload = {tag.getName(): tag for tag in self._payload + (value,)}
+
+        self.invalidate()
 
     def remove(self, name: str):
         if not name:
             raise ArgumentError(None, message="Invalid key.")
 
-        payload = self.getPayload()
+        tag = self._lookup(name)
+        if tag is None:
+            raise NBTException(f"Tag not found: {name}")
+
+        if isinstance(self._payload, dict):
+            del self._payload[name]
+        else:
+            self._payload = tuple([child for child in self._payload if child is not tag])
 
-        for i in range(len(payload)):
-            if payload[i].getName() == name:
-                # Tag found, remove it
-                del payload[i]
-                return
+        if tag._parent is self:
+            tag._parent = None
 
-        raise NBTException(f"Tag not found: {name}")
+        self.invalidate()
 
     def clear(self):
         self.setPayload([])
 
     def __len__(self) -> int:
-        return len(self.getPayload())
+        return len(self._payload)
 
     def __getitem__(self, name: str) -> NBTNamedTag:
         return self.get(name)
@@ -131,7 +219,7 @@ class NBTTagCompound(NBTNamedTag[list[NBTNamedTag]]):
         return self
 
     def __iter__(self):
-        return iter(self.getPayload())
+        return iter(self._tags())
 
     def __contains__(self, name: str) -> bool:
         return self.has(name)
@@ -21,6 +21,8 @@ from lib.nbt import NBTTag, NBTTagType
 
 
 class NBTTagEnd(NBTTag):
+    __slots__ = ()
+
     _type: NBTTagType = NBTTagType.TAG_End
 
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
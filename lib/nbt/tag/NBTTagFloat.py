@@ -15,16 +15,20 @@
 # limitations under the License.
 
 
-from struct import pack
+from struct import Struct
 
 from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import FLOAT
 
 
 class NBTTagFloat(NBTNamedTag[float]):
+    __slots__ = ('_offset',)
+
     _type: NBTTagType = NBTTagType.TAG_Float
+    _struct: Struct = FLOAT
 
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
         return f"{self.getPayload()}f"
 
     def payloadAsBinary(self) -> bytes:
-        return pack('>f', self.getPayload())
+        return self._struct.pack(self.getPayload())
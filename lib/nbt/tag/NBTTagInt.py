@@ -15,16 +15,20 @@
 # limitations under the License.
 
 
-from struct import pack
+from struct import Struct
 
 from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import INT
 
 
 class NBTTagInt(NBTNamedTag[int]):
+    __slots__ = ('_offset',)
+
     _type: NBTTagType = NBTTagType.TAG_Int
+    _struct: Struct = INT
 
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
         return f"{self.getPayload()}"
 
     def payloadAsBinary(self) -> bytes:
-        return pack('>l', self.getPayload())
+        return self._struct.pack(self.getPayload())
@@ -20,5 +20,10 @@ from lib.nbt.tag import NBTTypedArray, NBTTagInt
 
 
 class NBTTagIntArray(NBTTypedArray[NBTTagInt]):
+    __slots__ = ()
+
     _type: NBTTagType = NBTTagType.TAG_Int_Array
     _prefix: str = 'I'
+    _suffix: str = ''
+    _typecode: str = 'i'
+    _elementType: type[NBTTagInt] = NBTTagInt
@@ -22,30 +22,61 @@ from lib.nbt import NBTTagType
 
 
 class NBTTagList(NBTNamedTag[list[NBTNamedTag]]):
+    __slots__ = ('_listType', '_payloadSize', '_raw')
+
     _type: NBTTagType = NBTTagType.TAG_List
-    _listType: NBTTagType = NBTTagType.TAG_End
+    _snbtBrackets: str = '[]'
+
+    def __new__(cls, *args, **kwargs):
+        # Lists of numbers are stored packed, see NBTPackedTagList
+        if cls is NBTTagList:
+            from lib.nbt.tag import NBTPackedTagList
+
+            listType = args[2] if len(args) > 2 else kwargs.get('listType', NBTTagType.TAG_End)
+            if listType in _PACKED_TYPES:
+                cls = NBTPackedTagList
+
+        return super().__new__(cls)
 
     def __init__(self, name: str, payload: list[NBTNamedTag] = [], listType: NBTTagType = NBTTagType.TAG_End, additionalMetadata: dict = {}):
         super().__init__(name, list(payload), additionalMetadata)
         self._listType = listType
+        self._payloadSize: int | None = None
+        self._raw: memoryview | None = None
+
+        for tag in self._payload:
+            self._adopt(tag)
 
     def getListType(self) -> NBTTagType:
         return self._listType
 
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
+        return self._encodeSNBT(format, iteration)
+
+    def payloadAsBinary(self) -> bytes:
+        return self._encodeBinary(False)
+
+    def _binaryParts(self) -> tuple[bytes, list[NBTNamedTag], bool, bytes]:
         payload = self.getPayload()
-        content = [tag.toSNBT(format, iteration + 1) for tag in payload]
+        return pack('>Bl', self.getListType().value, len(payload)), payload, False, b''
 
-        if not format:
-            return '[' + ','.join(content) + ']'
+    def setPayload(self, payload: list[NBTNamedTag]):
+        for tag in self._payload:
+            if tag._parent is self:
+                tag._parent = None
 
-        return "[\n" + ''.rjust(iteration * 2, ' ') + (",\n" + ''.rjust(iteration * 2, ' ')).join(content) + "\n" + ''.rjust((iteration - 1) * 2, ' ') + "]"
+        for tag in payload:
+            self._adopt(tag)
 
-    def payloadAsBinary(self) -> bytes:
-        payload = self.getPayload()
-        return pack('>B', self.getListType().value) + pack('>l', len(payload)) + b''.join([value.payloadAsBinary() for value in payload])
+        super().setPayload(payload)
 
-    def getPayloadSize(self) -> int:
+    def _removeChild(self, tag: NBTNamedTag) -> None:
+        for index, child in enumerate(self.getPayload()):
+            if child is tag:
+                self.remove(index)
+                return
+
+    def _computePayloadSize(self) -> int:
         payload = self.getPayload()
         return 1 + 4 + sum([item.getPayloadSize() for item in payload])
 
@@ -63,21 +94,31 @@ class NBTTagList(NBTNamedTag[list[NBTNamedTag]]):
         elif (self.getListType() != value.getType()):
             raise TypeError('The list type is ' + self.getListType().name + ' but the value type is ' + value.getType().name)
 
+        if payload[index]._parent is self:
+            payload[index]._parent = None
+
+        self._adopt(value)
         payload[index] = value
+        self.invalidate()
 
     def add(self, value: NBTNamedTag) -> None:
         if (self.getListType() != value.getType()):
             raise TypeError('The list type is ' + self.getListType().name + ' but the value type is ' + value.getType().name)
 
-        payload = self.getPayload()
-        payload.append(value)
+        self._adopt(value)
+        self.getPayload().append(value)
+        self.invalidate()
 
     def remove(self, index: int) -> None:
         payload = self.getPayload()
         if (index < 0 or index >= len(payload)):
             raise IndexError(f'Index out of bounds: {index}')
 
+        if payload[index]._parent is self:
+            payload[index]._parent = None
+
         del payload[index]
+        self.invalidate()
 
     def __len__(self) -> int:
         return len(self.getPayload())
@@ -103,3 +144,6 @@ class NBTTagList(NBTNamedTag[list[NBTNamedTag]]):
 
     def __contains__(self, value: NBTNamedTag) -> bool:
         return value in self.getPayload()
+
+
+_PACKED_TYPES = frozenset([NBTTagType.TAG_Byte, NBTTagType.TAG_Short, NBTTagType.TAG_Int, NBTTagType.TAG_Long, NBTTagType.TAG_Float, NBTTagType.TAG_Double])
@@ -15,16 +15,20 @@
 # limitations under the License.
 
 
-from struct import pack
+from struct import Struct
 
 from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import LONG
 
 
 class NBTTagLong(NBTNamedTag[int]):
+    __slots__ = ('_offset',)
+
     _type: NBTTagType = NBTTagType.TAG_Long
+    _struct: Struct = LONG
 
     def toSNBT(self, format: bool = True, iteration=1) -> str:
         return f"{self.getPayload()}l"
 
     def payloadAsBinary(self) -> bytes:
-        return pack('>q', self.getPayload())
+        return self._struct.pack(self.getPayload())
@@ -20,5 +20,10 @@ from lib.nbt.tag import NBTTypedArray, NBTTagLong
 
 
 class NBTTagLongArray(NBTTypedArray[NBTTagLong]):
+    __slots__ = ()
+
     _type: NBTTagType = NBTTagType.TAG_Long_Array
     _prefix: str = 'L'
+    _suffix: str = 'l'
+    _typecode: str = 'q'
+    _elementType: type[NBTTagLong] = NBTTagLong
@@ -15,20 +15,64 @@
 # limitations under the License.
 
 
-from struct import pack
-from re import sub
-
 from lib.nbt import NBTNamedTag, NBTTagType
+from lib.nbt.NBTBinary import USHORT
 
 
 class NBTTagString(NBTNamedTag[str]):
+    '''
+    The payload is kept in both forms once known: the str is decoded from the UTF-8 bytes the first time it's read,
+    and the bytes are encoded from the str the first time the tag is measured or written.
+    '''
+
+    __slots__ = ('_encoded', '_offset')
+
     _type: NBTTagType = NBTTagType.TAG_String
 
+    def __init__(self, name: str = '', payload: str | None = None, additionalMetadata: dict = {}, *, encoded: bytes | None = None):
+        '''
+        @param str name
+        @param str|None payload
+        @param dict additionalMetadata
+        @param bytes|None encoded The payload as UTF-8, when payload is None
+        '''
+
+        super().__init__(name, payload, additionalMetadata)
+        self._encoded = encoded
+
+    def getPayload(self) -> str:
+        if self._payload is None:
+            self._payload = str(self._encoded, 'utf-8') if self._encoded is not None else ''
+
+        return self._payload
+
+    def setPayload(self, payload: str):
+        self._encoded = None
+        super().setPayload(payload)
+
+    def getEncodedPayload(self) -> bytes:
+        '''
+        @return bytes The payload as UTF-8
+        '''
+
+        if self._encoded is None:
+            self._encoded = self.getPayload().encode('utf-8')
+
+        return self._encoded
+
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
-        return '"' + sub(r'([^\\])\"', r'\1\\"', self.getPayload()) + '"'
+        return '"' + self.getPayload().replace('\\', '\\\\').replace('"', '\\"') + '"'
 
     def payloadAsBinary(self) -> bytes:
-        return pack('>H', len(self.getPayload().encode('utf-8'))) + bytes(self.getPayload(), 'utf-8')
+        encoded = self.getEncodedPayload()
+        return USHORT.pack(len(encoded)) + encoded
+
+    def _writePayload(self, buffer: memoryview, offset: int) -> int:
+        encoded = self.getEncodedPayload()
+        USHORT.pack_into(buffer, offset, len(encoded))
+        buffer[offset + 2:offset + 2 + len(encoded)] = encoded
+
+        return offset + 2 + len(encoded)
 
-    def getPayloadSize(self) -> int:
-        return 2 + len(self.getPayload().encode('utf-8'))
+    def _computePayloadSize(self) -> int:
+        return 2 + len(self.getEncodedPayload())
@@ -15,50 +15,98 @@
 # limitations under the License.
 
 
+from array import array
+from collections.abc import Iterable
 from struct import pack
+import sys
 from typing import TypeVar, Generic
 
 from lib.nbt import NBTNamedTag
+from lib.nbt.NBTBinary import INT, packArrayInto
 
 
 T = TypeVar('T', bound=NBTNamedTag)
 
 
-class NBTTypedArray(NBTNamedTag[list[T]], Generic[T]):
+class NBTTypedArray(NBTNamedTag[array], Generic[T]):
+    '''
+    The values are stored in a packed array.array, element tags are only created when accessed.
+    '''
+
+    __slots__ = ('_offset',)
+
     _prefix: str = ''
+    _suffix: str = ''
+    _typecode: str = ''
+    _elementType: type[T]
+
+    def __init__(self, name: str = '', payload: Iterable[T | int] = [], additionalMetadata: dict = {}):
+        super().__init__(name, self._toArray(payload), additionalMetadata)
+
+    def _toArray(self, payload: Iterable[T | int]) -> array:
+        if isinstance(payload, array) and payload.typecode == self._typecode:
+            return payload
+
+        return array(self._typecode, [self._toValue(value) for value in payload])
+
+    def _toValue(self, value: T | int) -> int:
+        if not isinstance(value, NBTNamedTag):
+            return value
+        elif value.getType() != self._elementType._type:
+            raise TypeError('The array type is ' + self._elementType._type.name + ' but the value type is ' + value.getType().name)
+
+        return value.getPayload()
+
+    def setPayload(self, payload: Iterable[T | int]):
+        super().setPayload(self._toArray(payload))
 
     def toSNBT(self, format: bool = True, iteration: int = 1) -> str:
         payload = self.getPayload()
+        separator = ",\n" + ''.rjust(iteration * 2, ' ') if format else ','
+        content = (self._suffix + separator).join(map(str, payload)) + (self._suffix if payload else '')
 
         if not format:
-            return f'[{self._prefix};' + ','.join([value.toSNBT(format, iteration) for value in payload]) + ']'
+            return f'[{self._prefix};' + content + ']'
 
-        return f"[{self._prefix};\n" + ''.rjust(iteration * 2, ' ') + (",\n" + ''.rjust(iteration * 2, ' ')).join([value.toSNBT(format, iteration) for value in payload]) + "\n" + ''.rjust((iteration - 1) * 2, ' ') + "]"
+        return f"[{self._prefix};\n" + ''.rjust(iteration * 2, ' ') + content + "\n" + ''.rjust((iteration - 1) * 2, ' ') + "]"
 
     def payloadAsBinary(self) -> bytes:
         payload = self.getPayload()
-        return pack('>l', len(payload)) + b''.join([value.payloadAsBinary() for value in payload])
+        if payload.itemsize > 1 and sys.byteorder == 'little':
+            payload = array(self._typecode, payload)
+            payload.byteswap()
+
+        return pack('>l', len(payload)) + payload.tobytes()
+
+    def _writePayload(self, buffer: memoryview, offset: int) -> int:
+        payload = self.getPayload()
+        INT.pack_into(buffer, offset, len(payload))
+
+        return packArrayInto(payload, buffer, offset + 4)
 
-    def getPayloadSize(self) -> int:
-        return 4 + sum([value.getPayloadSize() for value in self.getPayload()])
+    def _computePayloadSize(self) -> int:
+        payload = self.getPayload()
+        return 4 + len(payload) * payload.itemsize
 
     def get(self, index: int) -> T:
         payload = self.getPayload()
         if (index < 0 or index >= len(payload)):
             raise IndexError(f'Index out of bounds: {index}')
 
-        return payload[index]
+        return self._elementType('', payload[index])
 
-    def set(self, index: int, value: T) -> None:
+    def set(self, index: int, value: T | int) -> None:
         payload = self.getPayload()
         if (index < 0 or index >= len(payload)):
             raise IndexError(f'Index out of bounds: {index}')
 
-        payload[index] = value
+        payload[index] = self._toValue(value)
+        self.invalidate()
 
-    def add(self, value: T) -> None:
+    def add(self, value: T | int) -> None:
         payload = self.getPayload()
-        payload.append(value)
+        payload.append(self._toValue(value))
+        self.invalidate()
 
     def remove(self, index: int) -> None:
         payload = self.getPayload()
@@ -66,6 +114,7 @@ class NBTTypedArray(NBTNamedTag[list[T]], Generic[T]):
             raise IndexError(f'Index out of bounds: {index}')
 
         payload.pop(index)
+        self.invalidate()
 
     def __len__(self) -> int:
         return len(self.getPayload())
@@ -73,21 +122,21 @@ class NBTTypedArray(NBTNamedTag[list[T]], Generic[T]):
     def __getitem__(self, index: int) -> T:
         return self.get(index)
 
-    def __setitem__(self, index: int, value: T) -> None:
+    def __setitem__(self, index: int, value: T | int) -> None:
         self.set(index, value)
 
     def __delitem__(self, index: int) -> None:
         self.remove(index)
 
-    def __iadd__(self, value: T):
+    def __iadd__(self, value: T | int):
         self.add(value)
         return self
 
     def __iter__(self):
-        return iter(self.getPayload())
+        return (self._elementType('', value) for value in self.getPayload())
 
     def __reversed__(self):
-        return reversed(self.getPayload())
+        return (self._elementType('', value) for value in reversed(self.getPayload()))
 
-    def __contains__(self, value: T) -> bool:
-        return value in self.getPayload()
+    def __contains__(self, value: T | int) -> bool:
+        return self._toValue(value) in self.getPayload()
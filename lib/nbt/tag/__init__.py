@@ -28,5 +28,9 @@ from .NBTTagByteArray import NBTTagByteArray
 from .NBTTagIntArray import NBTTagIntArray
 from .NBTTagLongArray import NBTTagLongArray
 from .NBTTagList import NBTTagList
+from .NBTPackedTagList import NBTPackedTagList
 
 from .NBTTagCompound import NBTTagCompound
+
+from .NBTLazyTagCompound import NBTLazyTagCompound
+from .NBTLazyTagList import NBTLazyTagList
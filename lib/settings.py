@@ -42,17 +42,39 @@ class Settings:
     Where to store log file
     '''
 
+    compression_level: int = 7
+    '''
+    gzip compression level used when saving binary NBT
+    '''
+
+    compression_block_size: int = 131072
+    '''
+    Size of the blocks compressed in parallel when saving binary NBT
+    '''
+
+    compression_threads: int = 0
+    '''
+    Number of threads compressing blocks in parallel, 0 for one per CPU and 1 to disable
+    '''
+
     def __init__(self, FILE: str = '/etc/nbtpy.conf') -> None:
         self.config.read(FILE)
         self.debug = self.config.getboolean('General', 'DEBUG', fallback=False)
         self.log_path = self.config.get('General', 'LOG_PATH', fallback='/tmp/nbtpy.log')
         self.format = self.config.getboolean('Output', 'FORMAT', fallback=True)
+        self.compression_level = self.config.getint('Compression', 'LEVEL', fallback=7)
+        self.compression_block_size = self.config.getint('Compression', 'BLOCK_SIZE', fallback=131072)
+        self.compression_threads = self.config.getint('Compression', 'THREADS', fallback=0)
 
     def __repr__(self) -> str:
         return f"[General]\n"\
             f"  Debug: {self.debug}\n"\
             f"[Output]\n"\
-            f"  Format: {self.format}"
+            f"  Format: {self.format}\n"\
+            f"[Compression]\n"\
+            f"  Level: {self.compression_level}\n"\
+            f"  Block size: {self.compression_block_size}\n"\
+            f"  Threads: {self.compression_threads}"
 
 
 settings = Settings()
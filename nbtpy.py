@@ -22,10 +22,9 @@ from dataclasses import dataclass
 from os.path import exists
 import dearpygui.dearpygui as imgui
 import sys
-import gzip
 
-from lib.nbt import NBTNamedTag, NBTParser, NBTTagType, NBTException
-from lib.nbt.tag import NBTTagByte, NBTTagByteArray, NBTTagCompound, NBTTagDouble, NBTTagFloat, NBTTagInt, NBTTagIntArray, NBTTagList, NBTTagLong, NBTTagLongArray, NBTTagShort, NBTTagString
+from lib.nbt import NBTNamedTag, NBTParser, NBTTagType, NBTException, NBTCompression
+from lib.nbt.tag import NBTTagByte, NBTTagByteArray, NBTTagCompound, NBTTagDouble, NBTTagFloat, NBTTagInt, NBTTagIntArray, NBTTagList, NBTTagLong, NBTTagLongArray, NBTTagShort, NBTTagString, NBTTypedArray, NBTPackedTagList
 
 from lib.util import __version__
 from lib.settings import settings
@@ -78,10 +77,9 @@ def parse_file(filename_full: str, filename: str, snbt: bool):
 
     if snbt:
         with open(filename_full, 'r') as file:
-            nbt = NBTParser.parseSNBT("\n".join(file.readlines()))
+            nbt = NBTParser.parseSNBTStream(file)
     else:
-        with open(filename_full, 'rb') as file:
-            nbt = NBTParser.parse(gzip.decompress(file.read()))
+        nbt = NBTParser.parseFile(filename_full, keepRaw=True)
 
     if not isinstance(nbt, NBTTagCompound):
         raise NBTException("Invalid NBT file")
@@ -110,10 +108,12 @@ def handle_open_file(sender: str, app_data, user_data):
 def write_file(filename_full: str, nbt: NBTTagCompound, snbt: bool):
     if snbt:
         with open(filename_full, 'w') as file:
-            file.write(nbt.toSNBT())
+            nbt.writeSNBT(file)
     else:
         with open(filename_full, 'wb') as file:
-            file.write(gzip.compress(nbt.toBinary(), 7))
+            buffer = bytearray(nbt.getByteLength())
+            nbt.writeBinary(buffer)
+            file.write(NBTCompression.GZIP.compress(buffer, settings.compression_level, settings.compression_block_size, settings.compression_threads))
 
 
 def handle_save_file_as(sender: str, app_data, user_data):
@@ -130,14 +130,19 @@ def handle_save_file_as(sender: str, app_data, user_data):
         write_file(file_name_full, open_files[current_file].nbt, True)
 
 
-def input_callback(sender: int | str, value: str, data: tuple[NBTNamedTag, str]):
-    tag, name = data
+def input_callback(sender: int | str, value: str, data: tuple[NBTNamedTag, str, NBTNamedTag | None]):
+    tag, name, parent_tag = data
 
     if tag is None:
         return
 
     tag.setPayload(value)
 
+    if isinstance(parent_tag, NBTTypedArray) or isinstance(parent_tag, NBTPackedTagList):
+        # Array and number list elements are detached copies of the packed values, so write the value back
+        index = int(imgui.get_item_label(imgui.get_item_parent(sender))[1:-1])
+        parent_tag.set(index, tag)
+
 
 def rename_tag(sender: int | str, __, data: tuple[NBTNamedTag, int | str, NBTNamedTag | None, int | str | None]):
     tag, container_tag, parent_tag, parent_id = data
@@ -203,44 +208,46 @@ def paste_clipboard(sender: int | str, __, data: tuple[NBTNamedTag, int | str]):
         message_box('Error', 'Nothing to paste')
         return
 
-    tag_name = clipboard.getName()
+    # Each tag belongs to a single container, so paste a copy of the clipboard
+    tag = NBTParser.parse(clipboard.toBinary())
+    tag_name = tag.getName()
 
     if isinstance(parent_tag, NBTTagByteArray):
         if not isinstance(clipboard, NBTTagByte):
             message_box('Error', f'Cannot paste {clipboard.getTypeName()} into byte array.')
             return
 
-        parent_tag += clipboard
+        parent_tag += tag
         tag_name = f'[{len(parent_tag) - 1}]'
     elif isinstance(parent_tag, NBTTagIntArray):
         if not isinstance(clipboard, NBTTagInt):
             message_box('Error', f'Cannot paste {clipboard.getTypeName()} into int array.')
             return
 
-        parent_tag += clipboard
+        parent_tag += tag
         tag_name = f'[{len(parent_tag) - 1}]'
     elif isinstance(parent_tag, NBTTagLongArray):
         if not isinstance(clipboard, NBTTagLong):
             message_box('Error', f'Cannot paste {clipboard.getTypeName()} into long array.')
             return
 
-        parent_tag += clipboard
+        parent_tag += tag
         tag_name = f'[{len(parent_tag) - 1}]'
     elif isinstance(parent_tag, NBTTagList):
         if clipboard.getType() != parent_tag.getListType():
             message_box('Error', f'Cannot paste {clipboard.getTypeName()} into this tag.')
             return
 
-        parent_tag += clipboard
+        parent_tag += tag
         tag_name = f'[{len(parent_tag) - 1}]'
     elif isinstance(parent_tag, NBTTagCompound):
         if clipboard.getName() in parent_tag:
             message_box('Error', f'Cannot paste {clipboard.getName()} into this tag. A tag with that name already exists.')
             return
 
-        parent_tag += clipboard
+        parent_tag += tag
 
-    parse_tag(tag_name, clipboard, isinstance(parent_tag, NBTTagCompound), parent_tag, container_id)
+    parse_tag(tag_name, tag, isinstance(parent_tag, NBTTagCompound), parent_tag, container_id)
 
 
 def add_tag(sender: int | str, __, data: tuple[NBTNamedTag, NBTTagType, int | str]):
@@ -381,26 +388,26 @@ def parse_tag(name: str, tag: NBTNamedTag, allow_rename: bool = False, parent_ta
             elif isinstance(tag, NBTTagLongArray):
                 valid_new_tags = [NBTTagType.TAG_Long]
 
-            for index, value in enumerate(tag.getPayload()):
+            for index, value in enumerate(tag):
                 parse_tag(f"[{index}]", value, parent_tag=tag, parent_id=imgui_id)
     else:
         with imgui.tree_node(parent=parent_id if parent_id is not None else 0, label=name, selectable=True, leaf=True, payload_type=tag.getTypeName()):
             imgui_id = imgui.last_item()
 
             if isinstance(tag, NBTTagInt):
-                imgui.add_input_int(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_int(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagShort):
-                imgui.add_input_int(label='', min_value=-32768, max_value=32767, min_clamped=True, max_clamped=True, default_value=tag.getPayload(), width=250, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_int(label='', min_value=-32768, max_value=32767, min_clamped=True, max_clamped=True, default_value=tag.getPayload(), width=250, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagByte):
-                imgui.add_input_int(label='', min_value=-128, max_value=127, min_clamped=True, max_clamped=True, default_value=tag.getPayload(), width=250, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_int(label='', min_value=-128, max_value=127, min_clamped=True, max_clamped=True, default_value=tag.getPayload(), width=250, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagLong):
-                imgui.add_input_text(label='', default_value=str(tag.getPayload()), width=250, hexadecimal=True, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_text(label='', default_value=str(tag.getPayload()), width=250, hexadecimal=True, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagFloat):
-                imgui.add_input_float(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_float(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagDouble):
-                imgui.add_input_double(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_double(label='', default_value=tag.getPayload(), width=250, user_data=(tag, name, parent_tag), callback=input_callback)
             elif isinstance(tag, NBTTagString):
-                imgui.add_input_text(label='', default_value=tag.getPayload(), width=250, multiline=tag.getPayloadSize() > 100, user_data=(tag, name), callback=input_callback)
+                imgui.add_input_text(label='', default_value=tag.getPayload(), width=250, multiline=tag.getPayloadSize() > 100, user_data=(tag, name, parent_tag), callback=input_callback)
             else:
                 raise NBTException(f"Unknown tag type: {tag.__class__.__name__}")
 